@@ -1,23 +1,22 @@
 #!/usr/bin/env python3
-import os
-import shutil
 """
 Audiobook Uploader for Telegram
 Reads audiobook metadata and uploads to Telegram with formatted captions.
 """
 
+import errno
 import os
+import shutil
+import time
 import logging
-from typing import Dict, Optional
-from mutagen import File
-from mutagen.mp4 import MP4
-from datetime import timedelta
-import humanize
-from telegram_uploader import TelegramUploader
-from typing import Callable, Optional
+from telegram_uploader import TelegramUploader, install_uvloop
+from metadata import AudiobookMetadata
+from typing import Callable
 
 ProgressCallback = Callable[[int, int], None]
 
+PROGRESS_LOG_INTERVAL = 1.0  # Minimum seconds between progress log lines
+
 # Configure logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -25,68 +24,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class AudiobookMetadata:
-    """Class to handle audiobook metadata extraction and formatting."""
-    
-    def __init__(self, file_path: str):
-        self.file_path = file_path
-        self.metadata = None
-        self._read_metadata()
-
-    def _read_metadata(self) -> None:
-        """Read metadata from audiobook file."""
-        try:
-            audio = File(self.file_path)
-            if isinstance(audio, MP4):
-                self.metadata = {
-                    'title': audio.tags.get('\xa9nam', [''])[0],
-                    'artist': audio.tags.get('\xa9ART', [''])[0],
-                    'narrator': audio.tags.get('----:com.apple.iTunes:NARRATOR', [''])[0],
-                    'duration': str(timedelta(seconds=int(audio.info.length))),
-                    'year': audio.tags.get('\xa9day', [''])[0],
-                    'publisher': audio.tags.get('----:com.apple.iTunes:PUBLISHER', [''])[0],
-                }
-            else:
-                raise ValueError("Unsupported audio format")
-        except Exception as e:
-            logger.error(f"Error reading metadata: {str(e)}")
-            self.metadata = None
-
-    def format_caption(self) -> Optional[str]:
-        """Format metadata into a Telegram caption."""
-        if not self.metadata:
-            return None
-        
-        caption = "📚 *{}*\n".format(self.metadata.get('title', 'Unknown Title'))
-        
-        if self.metadata.get('artist'):
-            caption += "✍️ by {}\n".format(self.metadata['artist'])
-        
-        if self.metadata.get('narrator'):
-            caption += "🎙️ Narrated by {}\n".format(self.metadata['narrator'])
-        
-        if self.metadata.get('duration'):
-            caption += "⏱️ Length: {}\n".format(self.metadata['duration'])
-        
-        if self.metadata.get('year'):
-            caption += "📅 Released: {}\n".format(self.metadata['year'])
-        
-        if self.metadata.get('publisher'):
-            caption += "🏢 Publisher: {}\n".format(self.metadata['publisher'])
-        
-        return caption
-
+def move_file(src: str, dst: str) -> None:
+    """Move a file, renaming in place unless it has to cross filesystems."""
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
 
 def progress_callback(current: int, total: int) -> None:
-    """Callback to track upload progress."""
+    """Callback to track upload progress, logging at most once per second."""
+    now = time.monotonic()
+    if current < total and now - progress_callback.last_log < PROGRESS_LOG_INTERVAL:
+        return
+    progress_callback.last_log = now
     try:
-        percentage = (current / total) * 100 if total else 0
-        transferred = humanize.naturalsize(current)
-        total_size = humanize.naturalsize(total)
-        logger.info(f"Upload progress: {percentage:.1f}% ({transferred} / {total_size})")
+        percentage = (current * 100) // total if total else 0
+        logger.info(f"Upload progress: {percentage}% ({current >> 20}MB / {total >> 20}MB)")
     except Exception as e:
         logger.error(f"Error in progress callback: {str(e)}")
 
+progress_callback.last_log = 0.0
+
 async def main():
     """Main function to handle the upload process."""
     try:
@@ -102,11 +62,12 @@ async def main():
 
         # Read metadata and format caption
         logger.info(f"Reading metadata from: {os.path.basename(file_path)}")
-        audiobook = AudiobookMetadata(file_path)
-        caption = audiobook.format_caption()
-        if not caption:
-            logger.error("Failed to generate caption from metadata")
+        try:
+            audiobook = AudiobookMetadata(file_path)
+        except ValueError as e:
+            logger.error(f"Failed to read metadata: {str(e)}")
             return
+        caption = audiobook.format_caption()
 
         # Upload to Telegram with progress tracking
         logger.info("Initializing Telegram upload...")
@@ -143,14 +104,14 @@ async def main():
             # Move the audiobook file
             processed_path = os.path.join(processed_dir, os.path.basename(file_path))
             try:
-                shutil.move(file_path, processed_path)
+                move_file(file_path, processed_path)
                 logger.info(f"Moved file to processed directory: {processed_path}")
                 
                 # Move the .ready file if it exists
                 ready_file = file_path + '.ready'
                 if os.path.exists(ready_file):
                     ready_processed_path = processed_path + '.ready'
-                    shutil.move(ready_file, ready_processed_path)
+                    move_file(ready_file, ready_processed_path)
                     logger.info(f"Moved .ready file to processed directory: {ready_processed_path}")
             except Exception as e:
                 logger.error(f"Failed to move file to processed directory: {str(e)}")
@@ -162,5 +123,6 @@ async def main():
 
 if __name__ == "__main__":
     import asyncio
+    install_uvloop()
     asyncio.run(main())
 
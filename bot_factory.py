@@ -0,0 +1,60 @@
+import asyncio
+import functools
+import os
+import random
+from datetime import timedelta
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter
+from telegram.request import HTTPXRequest
+from rate_limit import throttle
+
+
+def get_bot(token: str = None) -> Bot:
+    """Return the shared Bot for `token`, BOT_TOKEN by default.
+
+    Every caller in the process reuses one warm HTTP/2 connection pool
+    instead of building its own on each call.
+    """
+    return _cached_bot(token or os.environ['BOT_TOKEN'])
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_bot(token: str) -> Bot:
+    return Bot(
+        token=token,
+        request=HTTPXRequest(http_version='2', pool_timeout=60, connection_pool_size=8)
+    )
+
+
+async def with_retry(call, max_retries: int = 3, base: float = 1.0, cap: float = 30.0,
+                     jitter: float = 0.5):
+    """Await `call()`, retrying flood limits and transient network errors.
+
+    RetryAfter waits as long as Telegram asks; other network errors wait
+    min(cap, base * 2**attempt), stretched by up to `jitter`. BadRequest
+    and any other error is raised at once.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except RetryAfter as e:
+            if attempt == max_retries:
+                raise
+            delay = e.retry_after
+            if isinstance(delay, timedelta):
+                delay = delay.total_seconds()
+        except BadRequest:
+            raise
+        except NetworkError:
+            if attempt == max_retries:
+                raise
+            delay = min(cap, base * 2 ** attempt) * (1 + jitter * random.random())
+        await asyncio.sleep(delay)
+
+
+async def send_message(bot: Bot, chat_id, text: str, **kwargs):
+    """Send a message under the shared rate limits, retrying via with_retry."""
+    async def send():
+        await throttle(chat_id)
+        return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+    return await with_retry(send)
@@ -1,6 +1,5 @@
-from mutagen.mp4 import MP4
-from datetime import timedelta
 import os
+from metadata import AudiobookMetadata
 
 def format_duration(milliseconds):
     """Convert milliseconds to human readable duration."""
@@ -22,32 +21,27 @@ def format_duration(milliseconds):
 def extract_metadata(file_path):
     """Extract metadata from M4B file."""
     try:
-        audio = MP4(file_path)
-        
-        # Print all available tags for debugging
-        print("Available tags:", audio.tags.keys())
-        
-        # Try multiple possible publisher tags
-        publisher = (
-            audio.tags.get('cprt', [None])[0] or  # Copyright tag
-            audio.tags.get('©pub', [None])[0] or  # Publisher tag
-            audio.tags.get('purd', [None])[0] or  # Purchase date
-            'Unknown Publisher'
-        )
-        
-        metadata = {
-            'title': audio.tags.get('©nam', ['Unknown Title'])[0],
-            'author': audio.tags.get('©wrt', ['Unknown Author'])[0],
-            'narrator': audio.tags.get('©ART', ['Unknown Narrator'])[0],
-            'year': audio.tags.get('©day', ['Unknown'])[0],
-            'publisher': publisher,
-            'mediatype': 'Audiobook',
-            'duration': format_duration(audio.info.length * 1000)  # Convert seconds to milliseconds
-        }
-        return metadata
-        
-    except Exception as e:
+        audiobook = AudiobookMetadata(file_path)
+    except (FileNotFoundError, ValueError) as e:
         raise Exception(f"Error reading metadata: {str(e)}")
+    
+    # Try multiple possible publisher tags
+    publisher = (
+        audiobook.get_copyright() or  # Copyright tag
+        audiobook.get_publisher() or  # Publisher tag
+        audiobook.get_purchase_date() or  # Purchase date
+        'Unknown Publisher'
+    )
+    
+    return {
+        'title': audiobook.raw_metadata.get('©nam', ['Unknown Title'])[0],
+        'author': audiobook.get_author() or 'Unknown Author',
+        'narrator': audiobook.get_narrator() or 'Unknown Narrator',
+        'year': audiobook.get_release_year() or 'Unknown',
+        'publisher': publisher,
+        'mediatype': 'Audiobook',
+        'duration': format_duration(audiobook.duration_seconds * 1000)  # Convert seconds to milliseconds
+    }
 
 def format_caption(metadata):
     """Generate caption from metadata in specified format."""
@@ -0,0 +1,12 @@
+import os
+import types
+from dotenv import load_dotenv
+
+# Parse .env once per process; scripts read settings from ENV afterwards
+load_dotenv()
+
+ENV = types.MappingProxyType({
+    name: os.getenv(name)
+    for name in ('BOT_TOKEN', 'TELEGRAM_API_ID', 'TELEGRAM_API_HASH',
+                 'TELEGRAM_CHAT_ID', 'DATABASE_URL')
+})
@@ -1,13 +1,13 @@
-import os
-from dotenv import load_dotenv
-import requests
+import httpx
 import json
-
-# Load environment variables
-load_dotenv()
+import orjson
+from env import ENV
 
 # Get bot token from environment variable
-BOT_TOKEN = os.getenv('BOT_TOKEN')
+BOT_TOKEN = ENV['BOT_TOKEN']
+
+# Shared client so repeated calls reuse the HTTP/2 connection
+_CLIENT = httpx.Client(http2=True, timeout=30.0)
 
 def get_bot_info():
     # Telegram Bot API endpoint for getMe
@@ -15,11 +15,11 @@ def get_bot_info():
     
     try:
         # Make the API request
-        response = requests.get(url)
+        response = _CLIENT.get(url)
         response.raise_for_status()  # Raise an exception for bad status codes
         
         # Parse the JSON response
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data["ok"]:
             bot_info = data["result"]
@@ -34,7 +34,7 @@ def get_bot_info():
         else:
             print("Failed to get bot information")
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error making request: {e}")
     except json.JSONDecodeError as e:
         print(f"Error parsing response: {e}")
@@ -1,36 +1,40 @@
 #!/usr/bin/env python3
+import errno
 import os
+import shutil
 import sys
 import click
 import logging
 import signal
+import threading
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import time
-from pathlib import Path
 from dotenv import load_dotenv
 from metadata import AudiobookMetadata
 from telegram import Bot
-from telegram_uploader import TelegramUploader
+from bot_factory import get_bot
 from tqdm import tqdm
+import aiofiles
+import aiohttp
 
 # Maximum file size (4GB for Telegram Premium)
 MAX_FILE_SIZE = 4 * 1024 * 1024 * 1024  # 4GB
+TELEGRAM_API_URL = "https://api.telegram.org"
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read from disk per request body chunk
+PAGE_CACHE_DROP_INTERVAL = 64 * 1024 * 1024  # Release uploaded pages from the cache this often
 import asyncio
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('audiobook_uploader.log')
-    ]
-)
-logger = logging.getLogger(__name__)
+# inotify reports IN_CLOSE_WRITE, so on Linux a file is known to be fully
+# written as soon as the writer closes it
+CLOSE_EVENTS_SUPPORTED = sys.platform.startswith('linux')
+if CLOSE_EVENTS_SUPPORTED:
+    from watchdog.observers.inotify import InotifyObserver
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 def validate_env():
     """Validate required environment variables are set."""
@@ -42,43 +46,86 @@ def validate_env():
         sys.exit(1)
 
 
-async def upload_to_telegram(bot: Bot, file_path: str, caption: str):
-    """Upload a file to Telegram with progress tracking."""
+async def _read_file_chunks(file_path: str, progress_bar):
+    """Yield the file in small chunks so the upload never holds it in memory."""
+    async with aiofiles.open(file_path, 'rb') as f:
+        # Not available on macOS/Windows; reads work the same without the hints
+        fadvise = getattr(os, 'posix_fadvise', None)
+        if fadvise:
+            fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        offset = dropped = 0
+        while True:
+            chunk = await f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            offset += len(chunk)
+            if fadvise and offset - dropped >= PAGE_CACHE_DROP_INTERVAL:
+                # Sent data won't be read again; don't let it push other files out of the cache
+                fadvise(f.fileno(), dropped, offset - dropped, os.POSIX_FADV_DONTNEED)
+                dropped = offset
+            progress_bar.update(len(chunk))
+            yield chunk
+
+
+def _upload_session() -> aiohttp.ClientSession:
+    """Create the HTTP session document uploads are posted through; call on the loop."""
+    return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=1200))
+
+
+async def _post_form(session: aiohttp.ClientSession, url: str, form: aiohttp.FormData):
+    """POST ``form`` and return the response's ``(status, parsed JSON body)``."""
+    async with session.post(url, data=form) as response:
+        return response.status, await response.json()
+
+
+async def upload_to_telegram(bot: Bot, file_path: str, caption: str, file_size: int = None,
+                             session: aiohttp.ClientSession = None):
+    """Upload a file to Telegram with progress tracking.
+
+    The document is streamed from disk straight into the multipart request
+    body, so memory use stays flat regardless of the audiobook size. Pass
+    ``file_size`` when the caller has already stat'ed the file, and
+    ``session`` to reuse its warm connection to the Bot API; without one a
+    session is opened for this upload alone.
+    """
     try:
-        file_size = Path(file_path).stat().st_size
+        if file_size is None:
+            file_size = os.stat(file_path).st_size
         if file_size > MAX_FILE_SIZE:
             raise click.ClickException(f"File size {file_size/1024/1024/1024:.2f}GB exceeds Telegram's 4GB limit")
 
-        uploader = TelegramUploader(bot=bot)
         progress_bar = tqdm(
             total=file_size,
             unit='B',
             unit_scale=True,
             desc=f"Uploading {os.path.basename(file_path)}",
-            dynamic_ncols=True
+            dynamic_ncols=True,
+            # Redraws are blocking stderr writes on the event loop; keep them rare
+            mininterval=1.0
         )
 
-        async def progress_callback(current, total, filename, chat_id, speed, percentage, eta):
-            progress_bar.n = current
-            progress_bar.set_postfix({
-                'Speed': f"{speed/1024/1024:.2f}MB/s",
-                'ETA': eta,
-                'Progress': f"{percentage:.1f}%"
-            }, refresh=True)
-            progress_bar.refresh()
+        form = aiohttp.FormData()
+        form.add_field('chat_id', str(os.getenv('TELEGRAM_CHAT_ID')))
+        form.add_field('caption', caption)
+        form.add_field(
+            'document',
+            _read_file_chunks(file_path, progress_bar),
+            filename=os.path.basename(file_path),
+            content_type='audio/mp4'
+        )
 
+        url = f"{TELEGRAM_API_URL}/bot{bot.token}/sendDocument"
         try:
-            await uploader.upload_file(
-                file_path=file_path,
-                chat_id=os.getenv('TELEGRAM_CHAT_ID'),
-                caption=caption,
-                progress_callback=progress_callback
-            )
-            progress_bar.close()
+            if session is None:
+                async with _upload_session() as own_session:
+                    status, result = await _post_form(own_session, url, form)
+            else:
+                status, result = await _post_form(session, url, form)
+            if not result.get('ok'):
+                raise RuntimeError(result.get('description', f"HTTP {status}"))
             return True  # Indicate successful upload
-        except Exception as e:
+        finally:
             progress_bar.close()
-            raise e
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}\nFull error: {repr(e)}")
         raise click.ClickException(f"Upload failed: {str(e)}")
@@ -90,7 +137,17 @@ def cli():
     This tool helps you generate metadata-based captions for audiobooks
     and upload them to Telegram with proper formatting.
     """
-    pass
+    # Set up here rather than at import, so the metadata pool's spawned
+    # workers, which import this module again, don't repeat it
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler('audiobook_uploader.log')
+        ]
+    )
+    load_dotenv()
 
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
@@ -110,7 +167,7 @@ def upload(file_path, no_upload):
             click.echo(caption)
             return
 
-        bot = Bot(token=os.getenv('BOT_TOKEN'))
+        bot = get_bot()
         asyncio.run(upload_to_telegram(bot, file_path, caption))
         
         click.echo("Upload completed successfully!")
@@ -140,7 +197,7 @@ def test():
     """
     try:
         validate_env()
-        bot = Bot(token=os.getenv('BOT_TOKEN'))
+        bot = get_bot()
         
         click.echo("Testing configuration...")
         asyncio.run(bot.send_message(
@@ -152,73 +209,176 @@ def test():
         logger.error(f"Configuration test failed: {str(e)}")
         raise click.ClickException(f"Test failed: {str(e)}")
 
+def _extract_and_format_caption(file_path):
+    """Return ``(caption, file_size)`` for an audiobook; runs in the metadata pool."""
+    file_size = os.stat(file_path).st_size
+    return AudiobookMetadata(file_path).format_caption(), file_size
+
 class AudiobookHandler(FileSystemEventHandler):
-    """Handler for audiobook file events."""
+    """Handler for audiobook file events.
+
+    Uploads run on a background event loop so several files can be in flight
+    at once (bounded by ``max_concurrent``), while the move to the processed
+    directory still happens in the order the files were detected.
+    """
     PROCESSED_DIR = 'processed'  # Directory for processed files
+    STABLE_INTERVAL = 2  # Seconds between size/mtime checks without close events
     
-    def __init__(self):
+    def __init__(self, max_concurrent=3, wait_for_close=CLOSE_EVENTS_SUPPORTED):
         self.processing = set()
         self.is_shutting_down = False
+        self.max_concurrent = max_concurrent
+        self.wait_for_close = wait_for_close
+        self._semaphore = None
+        self._indices = itertools.count()
+        self._polls = {}  # Stability checks still running, by path
+        self._schedule_lock = threading.Lock()  # Guards processing and _polls across threads
+        self._next_to_complete = 0
+        self._pending = {}
+        self._session = None  # aiohttp session shared by all uploads, opened in start()
+        self._meta_pool = None  # Metadata parsing processes, started in start()
         self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._loop_thread.start()
 
     def is_file_ready(self, file_path):
         """Check if a file has a corresponding .ready marker file."""
         ready_marker = file_path + '.ready'
         return os.path.exists(ready_marker)
 
-    async def async_process_file(self, event):
-        if event.src_path in self.processing:
-            return
-            
-        self.processing.add(event.src_path)
+    def try_schedule(self, file_path):
+        """Queue a file for upload on the background loop unless it already is.
+
+        Called from both the observer and loop threads, so the check and the
+        add happen under one lock. Returns True if the file was queued.
+        """
+        with self._schedule_lock:
+            if file_path in self.processing:
+                return False
+            self.processing.add(file_path)
+            index = next(self._indices)
+        asyncio.run_coroutine_threadsafe(self.submit(index, file_path), self.loop)
+        return True
+
+    async def submit(self, index, file_path):
+        """Upload a file under the concurrency limit and record its result."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        uploaded = False
         try:
-            # Wait a short time to ensure file is completely written
-            await asyncio.sleep(2)
-                    
-            if not self.is_file_ready(event.src_path):
-                logger.info(f"Skipping file without ready marker: {event.src_path}")
-                return
+            async with self._semaphore:
+                uploaded = await self.async_process_file(file_path)
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {str(e)}\nFull error: {repr(e)}")
+        finally:
+            self._pending[index] = (file_path, uploaded)
+            self.drain()
+
+    def drain(self):
+        """Run completion handling for finished uploads in submission order."""
+        while self._next_to_complete in self._pending:
+            file_path, uploaded = self._pending.pop(self._next_to_complete)
+            self._next_to_complete += 1
+            try:
+                self.on_complete(file_path, uploaded)
+            finally:
+                with self._schedule_lock:
+                    self.processing.discard(file_path)
+
+    async def async_process_file(self, file_path):
+        """Upload a single audiobook; returns True if it reached Telegram."""
+        # Wait a short time to ensure file is completely written
+        await asyncio.sleep(2)
                 
-            logger.info(f"New audiobook detected: {event.src_path}")
-            metadata = AudiobookMetadata(event.src_path)
-            caption = metadata.format_caption()
+        if not self.is_file_ready(file_path):
+            logger.info(f"Skipping file without ready marker: {file_path}")
+            return False
             
-            file_size = Path(event.src_path).stat().st_size
-            if file_size > MAX_FILE_SIZE:
-                raise click.ClickException(f"File size {file_size/1024/1024/1024:.2f}GB exceeds Telegram's 4GB limit")
-                
-            bot = Bot(token=os.getenv('BOT_TOKEN'))
-            if await upload_to_telegram(bot, event.src_path, caption):
-                logger.info(f"Successfully uploaded: {event.src_path}")
-
-                # Move file to processed directory after successful upload
-                processed_dir = os.path.join(os.path.dirname(event.src_path), self.PROCESSED_DIR)
-                if not os.path.exists(processed_dir):
-                    os.makedirs(processed_dir)
-                    logger.info(f"Created processed directory: {processed_dir}")
-
-                processed_path = os.path.join(processed_dir, os.path.basename(event.src_path))
-                try:
-                    os.rename(event.src_path, processed_path)
-                    logger.info(f"Moved file to processed directory: {processed_path}")
-                except OSError as e:
-                    logger.error(f"Failed to move file to processed directory: {str(e)}")
-                    return
-
-                # Remove the .ready marker file
-                try:
-                    ready_marker = event.src_path + '.ready'
-                    if os.path.exists(ready_marker):
-                        os.remove(ready_marker)
-                        logger.info(f"Removed .ready marker file: {ready_marker}")
-                except Exception as e:
-                    logger.warning(f"Failed to remove .ready marker file: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error processing file {event.src_path}: {str(e)}\nFull error: {repr(e)}")
+        logger.info(f"New audiobook detected: {file_path}")
+        # Parse in a worker process; one stat there serves the size check and the upload
+        caption, file_size = await asyncio.get_running_loop().run_in_executor(
+            self._meta_pool, _extract_and_format_caption, file_path)
+        if file_size > MAX_FILE_SIZE:
+            raise click.ClickException(f"File size {file_size/1024/1024/1024:.2f}GB exceeds Telegram's 4GB limit")
+        
+        bot = get_bot()
+        return await upload_to_telegram(bot, file_path, caption, file_size=file_size,
+                                        session=self._session)
+
+    async def _open(self):
+        self._session = _upload_session()
+        await get_bot().initialize()
+
+    async def _close(self):
+        try:
+            if self._session is not None:
+                await self._session.close()
         finally:
-            if event.src_path in self.processing:
-                self.processing.remove(event.src_path)
+            await get_bot().shutdown()
+
+    def start(self):
+        """Start the metadata pool and open the shared Telegram connections."""
+        # Metadata parsing is CPU bound pure Python, so backlogs parse in parallel
+        # processes. Spawn avoids forking the watcher's threads.
+        self._meta_pool = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                              mp_context=multiprocessing.get_context('spawn'))
+        future = asyncio.run_coroutine_threadsafe(self._open(), self.loop)
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning(f"Failed to initialize Telegram connection: {str(e)}")
+
+    def shutdown(self, timeout=10):
+        """Stop accepting new files, close the Telegram connections and the loop."""
+        self.is_shutting_down = True
+        if self.loop.is_closed():
+            return
+        future = asyncio.run_coroutine_threadsafe(self._close(), self.loop)
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Failed to close Telegram connection: {str(e)}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=timeout)
+        if not self._loop_thread.is_alive():
+            self.loop.close()
+        if self._meta_pool is not None:
+            self._meta_pool.shutdown(wait=False)
+
+    def on_complete(self, file_path, uploaded):
+        """Move a successfully uploaded file to the processed directory."""
+        if not uploaded:
+            return
+        logger.info(f"Successfully uploaded: {file_path}")
+
+        # Move file to processed directory after successful upload
+        processed_dir = os.path.join(os.path.dirname(file_path), self.PROCESSED_DIR)
+        os.makedirs(processed_dir, exist_ok=True)
+
+        processed_path = os.path.join(processed_dir, os.path.basename(file_path))
+        try:
+            try:
+                os.rename(file_path, processed_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # processed/ is on another filesystem (e.g. a mount point)
+                shutil.move(file_path, processed_path)
+            logger.info(f"Moved file to processed directory: {processed_path}")
+        except OSError as e:
+            logger.error(f"Failed to move file to processed directory: {str(e)}")
+            return
+
+        # Remove the .ready marker file
+        ready_marker = file_path + '.ready'
+        try:
+            os.remove(ready_marker)
+            logger.info(f"Removed .ready marker file: {ready_marker}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to remove .ready marker file: {str(e)}")
+
     def on_created(self, event):
         if self.is_shutting_down:
             logger.info("Ignoring new file during shutdown")
@@ -231,48 +391,93 @@ class AudiobookHandler(FileSystemEventHandler):
             m4b_file = event.src_path[:-6]  # Remove .ready extension
             if m4b_file.lower().endswith('.m4b') and os.path.exists(m4b_file):
                 logger.info(f"Ready marker detected for {m4b_file}")
-                if m4b_file not in self.processing:
+                if self.try_schedule(m4b_file):
                     logger.debug(f"Processing newly ready file: {m4b_file}")
-                    new_event = type(event)(src_path=m4b_file)
-                    self.loop.run_until_complete(self.async_process_file(new_event))
             return
         
         if not event.src_path.lower().endswith('.m4b'):
             return
         
         logger.info(f"New .m4b file detected: {event.src_path}")
-        logger.info("Waiting 10 seconds to ensure file is completely written...")
-        
-        # Wait and check if file size is stable
-        try:
-            initial_size = os.path.getsize(event.src_path)
-            time.sleep(10)  # Wait 10 seconds
-            final_size = os.path.getsize(event.src_path)
-            
-            if initial_size != final_size:
-                logger.info(f"File size changed during wait period. File is still being written: {event.src_path}")
+        if self.wait_for_close:
+            logger.debug(f"Waiting for writer to close: {event.src_path}")
+        # Files moved in from elsewhere never get a close event, so poll them too
+        self.watch_until_stable(event.src_path)
+
+    def on_moved(self, event):
+        if self.is_shutting_down or event.is_directory:
+            return
+        dest_path = event.dest_path
+        if not dest_path.lower().endswith('.m4b'):
+            return
+        if os.path.basename(os.path.dirname(dest_path)) == self.PROCESSED_DIR:
+            return
+        logger.info(f"New .m4b file moved in: {dest_path}")
+        self.watch_until_stable(dest_path)
+
+    def on_closed(self, event):
+        if self.is_shutting_down or event.is_directory:
+            return
+        if self.wait_for_close and event.src_path.lower().endswith('.m4b'):
+            logger.info(f"Writer closed {event.src_path}")
+            with self._schedule_lock:
+                poll = self._polls.pop(event.src_path, None)
+            if poll is not None:
+                poll.cancel()
+            self.mark_ready(event.src_path)
+
+    def watch_until_stable(self, file_path):
+        """Start a stability check for a file on the background loop."""
+        poll = asyncio.run_coroutine_threadsafe(self.wait_until_stable(file_path), self.loop)
+        with self._schedule_lock:
+            previous = self._polls.get(file_path)
+            self._polls[file_path] = poll
+        if previous is not None:
+            previous.cancel()
+        poll.add_done_callback(lambda done: self._forget_poll(file_path, done))
+
+    def _forget_poll(self, file_path, poll):
+        with self._schedule_lock:
+            if self._polls.get(file_path) is poll:
+                del self._polls[file_path]
+
+    async def wait_until_stable(self, file_path):
+        """Mark a file ready once its size and mtime stop changing."""
+        previous = None
+        while not self.is_shutting_down:
+            try:
+                st = os.stat(file_path)
+            except OSError as e:
+                logger.error(f"Error while checking file: {e}")
                 return
-            
-            # Create .ready file
-            ready_file = event.src_path + '.ready'
-            if not os.path.exists(ready_file):
-                with open(ready_file, 'w') as f:
-                    pass  # Create empty file
-                logger.info(f"Created .ready marker for {event.src_path}")
-            
+            current = (st.st_size, st.st_mtime_ns)
+            if current == previous:
+                self.mark_ready(file_path)
+                return
+            previous = current
+            await asyncio.sleep(self.STABLE_INTERVAL)
+
+    def mark_ready(self, file_path):
+        """Create the .ready marker for a completely written file and queue it."""
+        ready_file = file_path + '.ready'
+        try:
+            # O_EXCL creates the empty marker and checks for an existing one in one call
+            os.close(os.open(ready_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+            logger.info(f"Created .ready marker for {file_path}")
+        except FileExistsError:
+            pass
         except OSError as e:
-            logger.error(f"Error while checking file: {e}")
+            logger.error(f"Error while creating ready marker: {e}")
             return
         
-        if self.is_file_ready(event.src_path):
-            logger.debug(f"File ready for processing: {event.src_path}")
-            try:
-                self.loop.run_until_complete(self.async_process_file(event))
-            except Exception as e:
-                logger.error(f"Error processing {event.src_path}: {str(e)}\nFull error: {repr(e)}")
+        if self.try_schedule(file_path):
+            logger.debug(f"File ready for processing: {file_path}")
 
 def signal_handler(signum, frame):
     logger.info(f"Received signal {signum}")
+    if 'event_handler' in globals():
+        logger.info("Closing Telegram connection...")
+        event_handler.shutdown()
     if 'observer' in globals():
         logger.info("Stopping observer gracefully...")
         observer.stop()
@@ -280,7 +485,9 @@ def signal_handler(signum, frame):
 
 @cli.command()
 @click.argument('directory', type=click.Path(), default='/Users/cerinawithasea/audiobooks/completed')
-def watch(directory):
+@click.option('--max-concurrent', default=3, show_default=True, type=click.IntRange(min=1),
+              help="Maximum number of audiobooks uploaded at the same time")
+def watch(directory, max_concurrent):
     """Monitor a directory for new audiobooks and upload them.
     
     DIRECTORY is the path to watch for new .m4b files.
@@ -289,6 +496,7 @@ def watch(directory):
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    global event_handler, observer
     
     try:
         validate_env()
@@ -302,8 +510,9 @@ def watch(directory):
         click.echo(f"Watching {directory} for new audiobooks...")
         logger.info(f"Starting watch on directory: {directory}")
         
-        event_handler = AudiobookHandler()
-        observer = Observer()
+        event_handler = AudiobookHandler(max_concurrent=max_concurrent)
+        event_handler.start()
+        observer = InotifyObserver() if CLOSE_EVENTS_SUPPORTED else Observer()
         observer.schedule(event_handler, directory, recursive=False)
         observer.start()
         
@@ -315,12 +524,12 @@ def watch(directory):
                 time.sleep(1)
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
-            event_handler.is_shutting_down = True
+            event_handler.shutdown()
             observer.stop()
             click.echo("\nStopping watch...")
         except Exception as e:
             logger.error(f"Unexpected error in watch loop: {str(e)}")
-            event_handler.is_shutting_down = True
+            event_handler.shutdown()
             observer.stop()
         finally:
             logger.info("Waiting for observer to complete...")
@@ -1,10 +1,119 @@
-from typing import Dict, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 from pathlib import Path
+import functools
+import hashlib
+import json
 import logging
-from datetime import timedelta
-from mutagen.mp4 import MP4, MP4StreamInfoError
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mutagen.mp4 import MP4, MP4Tags, MP4StreamInfoError
 from mutagen import MutagenError
 
+# Parsed metadata is cached here, keyed by path, mtime and size
+CACHE_DIR = Path(os.getenv('AUDIOBOOK_CACHE_DIR', Path.home() / '.cache' / 'audiobook-bot'))
+
+
+def metadata_cache_file(file_path: Union[str, Path], namespace: str) -> Optional[Path]:
+    """Get the cache file for the current version of an audiobook file.
+    
+    Args:
+        file_path: Path to the audiobook file
+        namespace: Name of the parser storing the entry, so differently
+            shaped metadata dicts for the same file never collide
+        
+    Returns:
+        Optional[Path]: Cache file location, or None if the file can't be stat'ed
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    key = f"{namespace}|{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return CACHE_DIR / f"{digest}.json"
+
+
+def read_metadata_cache(cache_file: Optional[Path]) -> Optional[Dict[str, Any]]:
+    """Load a cached metadata dict.
+    
+    Returns:
+        Optional[Dict]: Cached metadata, or None on a cache miss
+    """
+    if cache_file is None:
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_metadata_cache(cache_file: Optional[Path], data: Dict[str, Any]) -> None:
+    """Atomically store a metadata dict; failures only cost a future re-parse."""
+    if cache_file is None:
+        return
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError, ValueError) as e:
+        logging.debug(f"Failed to write metadata cache {cache_file}: {e}")
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+class CaptionMP4Tags(MP4Tags):
+    """MP4 tags restricted to the text atoms used for captions.
+    
+    Unwanted ilst children are dropped before their payload is read, so
+    embedded cover art (often several MB) is never loaded into memory.
+    """
+    
+    CAPTION_ATOMS = frozenset(
+        name.encode('latin-1')
+        for name in ("©nam", "©wrt", "©ART", "©day", "©pub", "cprt", "purd")
+    )
+    
+    def load(self, atoms, fileobj):
+        try:
+            ilst = atoms.path(b"moov", b"udta", b"meta", b"ilst")[-1]
+        except KeyError:
+            pass  # Let MP4Tags report the missing atom
+        else:
+            ilst.children = [atom for atom in ilst.children if atom.name in self.CAPTION_ATOMS]
+        super().load(atoms, fileobj)
+
+
+class CaptionMP4(MP4):
+    """MP4 file that only parses caption related tags (see `CaptionMP4Tags`)."""
+    
+    MP4Tags = CaptionMP4Tags
+
+
+def load_caption_mp4(file_path: Union[str, Path]) -> CaptionMP4:
+    """Read the caption tags and stream info of an MP4/M4B file.
+    
+    The file is opened with O_NOATIME where available so metadata reads
+    don't cause atime writes on slow or network storage.
+    
+    Raises:
+        MutagenError: If the file is not a readable MP4 file
+    """
+    flags = os.O_RDONLY | getattr(os, 'O_NOATIME', 0)
+    try:
+        fd = os.open(file_path, flags)
+    except PermissionError:
+        # O_NOATIME is only allowed for the file's owner
+        fd = os.open(file_path, os.O_RDONLY)
+    with os.fdopen(fd, 'rb') as f:
+        return CaptionMP4(f)
+
+
 class AudiobookMetadata:
     """Handles metadata extraction and formatting for audiobook files.
     
@@ -17,6 +126,26 @@ class AudiobookMetadata:
         duration_seconds (float): Duration of the audiobook in seconds
     """
     
+    # Tags read by the getters, mapped to the attribute each is stored in.
+    # These are also the only tags worth caching.
+    TAG_ATTRIBUTES = (
+        ("©nam", "_title"),
+        ("©wrt", "_author"),
+        ("©ART", "_narrator"),
+        ("©pub", "_publisher"),
+        ("©day", "_year"),
+        ("cprt", "_copyright"),
+        ("purd", "_purchase_date"),
+    )
+    CACHED_TAGS = tuple(key for key, _ in TAG_ATTRIBUTES)
+    
+    # Many instances can be alive at once (see extract_many), so skip __dict__
+    __slots__ = ('file_path', 'raw_metadata', 'duration_seconds', '_duration_formatted') + tuple(
+        attr for _, attr in TAG_ATTRIBUTES)
+    
+    # Checked before the file is opened, so other files never reach mutagen
+    SUPPORTED_EXTENSIONS = frozenset({'.m4b', '.m4a', '.mp4'})
+    
     def __init__(self, file_path: Union[str, Path]) -> None:
         """Initialize with audiobook file path.
         
@@ -28,6 +157,8 @@ class AudiobookMetadata:
             ValueError: If the file type is not supported
         """
         self.file_path = Path(file_path)
+        if self.file_path.suffix.lower() not in self.SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported audiobook file type: {self.file_path.suffix or file_path}")
         if not self.file_path.exists():
             raise FileNotFoundError(f"Audiobook file not found: {file_path}")
         
@@ -35,15 +166,63 @@ class AudiobookMetadata:
         self.duration_seconds: float = 0.0
         self._extract_metadata()
     
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> List["AudiobookMetadata"]:
+        """Load metadata for every supported audiobook in a directory.
+        
+        Entries are filtered by extension while scanning, so only candidate
+        audiobooks are opened; see `extract_many` for how they are parsed.
+        
+        Args:
+            directory: Directory to scan (not recursive)
+            
+        Returns:
+            List[AudiobookMetadata]: Metadata for each audiobook, sorted by path
+        """
+        with os.scandir(directory) as entries:
+            paths = sorted(
+                entry.path for entry in entries
+                if os.path.splitext(entry.name)[1].lower() in cls.SUPPORTED_EXTENSIONS
+                and entry.is_file()
+            )
+        return extract_many(paths)
+    
+    @classmethod
+    def get_cached(cls, file_path: Union[str, Path]) -> "AudiobookMetadata":
+        """Get metadata for a file, reusing an earlier instance if unchanged.
+        
+        Instances are memoized in-process by resolved path, mtime and size
+        (see `_cached_metadata`), so a file changed on disk is parsed again.
+        
+        Args:
+            file_path: Path to the audiobook file
+            
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the file type is not supported
+        """
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        return _cached_metadata(str(path), stat.st_mtime_ns, stat.st_size)
+    
     def _extract_metadata(self) -> None:
         """Extract metadata from the audiobook file.
         
         Raises:
             ValueError: If metadata extraction fails
         """
+        cache_file = metadata_cache_file(self.file_path, 'metadata')
+        cached = read_metadata_cache(cache_file)
+        if cached is not None:
+            self.raw_metadata = cached['tags']
+            self.duration_seconds = cached['duration']
+            self._load_tags()
+            return
+        
         try:
-            audio = MP4(self.file_path)
-            self.raw_metadata = dict(audio.tags or {})
+            audio = load_caption_mp4(self.file_path)
+            tags = audio.tags or {}
+            self.raw_metadata = {key: tags[key] for key in self.CACHED_TAGS if key in tags}
             self.duration_seconds = audio.info.length
         except MP4StreamInfoError:
             logging.error(f"Failed to read audio stream from {self.file_path}")
@@ -51,6 +230,20 @@ class AudiobookMetadata:
         except MutagenError as e:
             logging.error(f"Failed to extract metadata: {e}")
             raise ValueError(f"Metadata extraction failed: {e}")
+        
+        self._load_tags()
+        tags = {}
+        for key, attr in self.TAG_ATTRIBUTES:
+            value = getattr(self, attr)
+            if value is not None:
+                tags[key] = [value]
+        write_metadata_cache(cache_file, {'tags': tags, 'duration': self.duration_seconds})
+    
+    def _load_tags(self) -> None:
+        """Store each value the getters need as an attribute, converted once."""
+        for key, attr in self.TAG_ATTRIBUTES:
+            setattr(self, attr, self._get_tag(key))
+        self._duration_formatted = self._format_duration()
     
     def get_title(self) -> str:
         """Get the audiobook title.
@@ -58,7 +251,7 @@ class AudiobookMetadata:
         Returns:
             str: Title of the audiobook, or filename if not found
         """
-        return self._get_tag("©nam") or self.file_path.stem
+        return self._title or self.file_path.stem
     
     def get_author(self) -> Optional[str]:
         """Get the book's author/composer.
@@ -66,7 +259,7 @@ class AudiobookMetadata:
         Returns:
             Optional[str]: Author name if found, None otherwise
         """
-        return self._get_tag("©wrt")
+        return self._author
     
     def get_narrator(self) -> Optional[str]:
         """Get the narrator/artist name.
@@ -74,7 +267,7 @@ class AudiobookMetadata:
         Returns:
             Optional[str]: Narrator name if found, None otherwise
         """
-        return self._get_tag("©ART")
+        return self._narrator
     
     def get_publisher(self) -> Optional[str]:
         """Get the publisher name.
@@ -82,7 +275,23 @@ class AudiobookMetadata:
         Returns:
             Optional[str]: Publisher name if found, None otherwise
         """
-        return self._get_tag("©pub")
+        return self._publisher
+    
+    def get_copyright(self) -> Optional[str]:
+        """Get the copyright notice.
+        
+        Returns:
+            Optional[str]: Copyright notice if found, None otherwise
+        """
+        return self._copyright
+    
+    def get_purchase_date(self) -> Optional[str]:
+        """Get the purchase date.
+        
+        Returns:
+            Optional[str]: Purchase date if found, None otherwise
+        """
+        return self._purchase_date
     
     def get_release_year(self) -> Optional[str]:
         """Get the release year.
@@ -90,7 +299,7 @@ class AudiobookMetadata:
         Returns:
             Optional[str]: Release year if found, None otherwise
         """
-        return self._get_tag("©day")
+        return self._year
     
     def get_duration_formatted(self) -> str:
         """Get formatted duration string.
@@ -98,11 +307,13 @@ class AudiobookMetadata:
         Returns:
             str: Duration in format "Xd HH:MM:SS" or "HH:MM:SS"
         """
-        duration = timedelta(seconds=int(self.duration_seconds))
-        days = duration.days
-        hours = duration.seconds // 3600
-        minutes = (duration.seconds % 3600) // 60
-        seconds = duration.seconds % 60
+        return self._duration_formatted
+    
+    def _format_duration(self) -> str:
+        """Format `duration_seconds` for `get_duration_formatted`."""
+        minutes, seconds = divmod(int(self.duration_seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        days, hours = divmod(hours, 24)
         
         if days > 0:
             return f"{days}d {hours:02d}:{minutes:02d}:{seconds:02d}"
@@ -129,25 +340,55 @@ class AudiobookMetadata:
         Returns:
             str: Formatted caption string with available metadata
         """
-        title = self.get_title()
-        author = self.get_author()
-        narrator = self.get_narrator()
-        duration = self.get_duration_formatted()
-        year = self.get_release_year()
-        publisher = self.get_publisher()
-        
-        caption_parts = [title]
-        
-        if author:
-            caption_parts.append(f"by {author}")
-        if narrator:
-            caption_parts.append(f"Narrated by {narrator}")
-        if duration:
-            caption_parts.append(f"Length: {duration}")
-        if year:
-            caption_parts.append(f"Release date: {year}")
-        if publisher:
-            caption_parts.append(f"Publisher: {publisher}")
-        
-        caption_parts.append("#audiobook")
-        return "\n".join(caption_parts)
+        author, narrator = self._author, self._narrator
+        year, publisher = self._year, self._publisher
+        parts = (
+            self.get_title(),
+            f"by {author}" if author else None,
+            f"Narrated by {narrator}" if narrator else None,
+            f"Length: {self._duration_formatted}",
+            f"Release date: {year}" if year else None,
+            f"Publisher: {publisher}" if publisher else None,
+            "#audiobook",
+        )
+        return "\n".join(filter(None, parts))
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_metadata(path: str, mtime_ns: int, size: int) -> AudiobookMetadata:
+    """Build the instance behind `AudiobookMetadata.get_cached`.
+    
+    mtime_ns and size are only part of the cache key.
+    """
+    return AudiobookMetadata(path)
+
+
+def _load_audiobook(path: Union[str, Path]) -> Optional[AudiobookMetadata]:
+    """Load one audiobook for `extract_many`, logging instead of raising."""
+    try:
+        return AudiobookMetadata.get_cached(path)
+    except (FileNotFoundError, ValueError) as e:
+        logging.warning(f"Skipping {path}: {e}")
+        return None
+
+
+def extract_many(paths: Iterable[Union[str, Path]],
+                 max_workers: Optional[int] = None) -> List[AudiobookMetadata]:
+    """Load metadata for many audiobooks concurrently.
+    
+    Parsing is dominated by seeks and reads through the atom tree, so threads
+    overlap the I/O of several files. Files that fail to parse are logged
+    and skipped.
+    
+    Args:
+        paths: Audiobook files to read
+        max_workers: Thread count, defaults to min(32, 4 * CPU count)
+        
+    Returns:
+        List[AudiobookMetadata]: Metadata for the readable files, in input order
+    """
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [audiobook for audiobook in executor.map(_load_audiobook, paths)
+                if audiobook is not None]
@@ -1,78 +1,114 @@
+import io
 import sys
-import re
+from collections import defaultdict
+from enum import IntEnum
 from pathlib import Path
 
-def read_file(file_path):
+def read_file(file_path: Path) -> str:
     try:
-        with open(file_path, 'r') as file:
-            return file.read()
+        return file_path.read_text(encoding='utf-8', errors='replace')
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         return ""
 
-def parse_library_entries(content):
-    lines = content.strip().split('\n')
-    entries = {}
+class _CleanTable(dict):
+    """str.translate table mapping characters outside [\\w\\s] to a space.
     
-    def clean_library_name(name):
-        # Remove special characters and normalize whitespace
-        cleaned = re.sub(r'[^\w\s]', ' ', name)
-        return ' '.join(cleaned.split())
+    Entries are filled in on first lookup, so only characters that actually
+    appear in library names get classified.
+    """
     
-    def is_library_card(text):
-        return bool(re.match(r'^[A-Z0-9]{6,}$', text) or 
-                re.match(r'^PACREG\d+$', text) or 
-                re.match(r'^\d{10,}$', text))
-        
-    def is_username(text):
-        return bool(re.search(r'[@.]', text) or 
-                re.match(r'^[a-zA-Z0-9_]{3,}$', text))
-        
-    def is_password(text):
-        return bool(re.match(r'^\d{4,}$', text) or
-                len(text) >= 4 and not is_username(text) and not is_library_card(text))
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        keep = char.isalnum() or char.isspace() or char == '_'
+        self[codepoint] = codepoint if keep else ' '
+        return self[codepoint]
+
+_CLEAN_TABLE = _CleanTable()
+
+class LineType(IntEnum):
+    OTHER = 0
+    CARD = 1
+    USERNAME = 2
+    PASSWORD = 3
+
+def clean_library_name(name):
+    # Remove special characters and normalize whitespace
+    return ' '.join(name.translate(_CLEAN_TABLE).split())
+
+def _classify(text):
+    """Classify a stripped line, checking card, username then password.
+    
+    Uses C-level str predicates instead of running several regexes per line.
+    isdecimal() matches the same characters as the regex \\d.
+    """
+    length = len(text)
+    ascii_alnum = text.isascii() and text.isalnum()
+    
+    # ^[A-Z0-9]{6,}$, ^PACREG\d+$ or ^\d{10,}$
+    if length >= 6 and ascii_alnum and (text.isupper() or text.isdigit()):
+        return LineType.CARD
+    if length > 6 and text.startswith('PACREG') and text[6:].isdecimal():
+        return LineType.CARD
+    if length >= 10 and text.isdecimal():
+        return LineType.CARD
+    
+    # [@.] anywhere or ^[a-zA-Z0-9_]{3,}$
+    if '@' in text or '.' in text:
+        return LineType.USERNAME
+    if length >= 3 and text.isascii():
+        word = text.replace('_', '')
+        if not word or word.isalnum():
+            return LineType.USERNAME
+    
+    # Anything else of 4+ characters (covers ^\d{4,}$ too)
+    if length >= 4:
+        return LineType.PASSWORD
+    return LineType.OTHER
+
+def parse_library_entries(content):
+    entries = defaultdict(list)
     
     current_library = None
     current_entry = {'card': None, 'username': None, 'password': None}
+    entry_dirty = False  # Set once any field of current_entry is filled in
     
-    for line in lines:
+    def flush():
+        # Store the entry being built (if any) and start a fresh one
+        nonlocal current_entry, entry_dirty
+        if current_library and entry_dirty:
+            entries[current_library].append(current_entry)
+            current_entry = {'card': None, 'username': None, 'password': None}
+            entry_dirty = False
+    
+    # Iterate lazily rather than splitting the whole dump into a list
+    for line in io.StringIO(content):
         line = line.strip()
         if not line:
-            if current_library and any(current_entry.values()):
-                if current_library not in entries:
-                    entries[current_library] = []
-                entries[current_library].append(dict(current_entry))
-                current_entry = {'card': None, 'username': None, 'password': None}
+            flush()
             continue
         
         # Identify the type of information
-        if is_library_card(line):
-            if current_entry['card'] and current_library:
+        line_type = _classify(line)
+        if line_type is LineType.CARD:
+            if current_entry['card']:
                 # Start new entry for same library
-                if current_library not in entries:
-                    entries[current_library] = []
-                entries[current_library].append(dict(current_entry))
-                current_entry = {'card': None, 'username': None, 'password': None}
+                flush()
             current_entry['card'] = line
-        elif not current_library and len(line.split()) <= 3 and not is_username(line):
-            if current_library and any(current_entry.values()):
-                if current_library not in entries:
-                    entries[current_library] = []
-                entries[current_library].append(dict(current_entry))
-                current_entry = {'card': None, 'username': None, 'password': None}
+            entry_dirty = True
+        elif not current_library and len(line.split()) <= 3 and line_type is not LineType.USERNAME:
             current_library = clean_library_name(line)
-        elif is_username(line):
+        elif line_type is LineType.USERNAME:
             current_entry['username'] = line
-        elif is_password(line):
+            entry_dirty = True
+        elif line_type is LineType.PASSWORD:
             current_entry['password'] = line
+            entry_dirty = True
     
     # Add the last entry
-    if current_library and any(current_entry.values()):
-        if current_library not in entries:
-            entries[current_library] = []
-        entries[current_library].append(dict(current_entry))
+    flush()
     
-    return entries
+    return dict(entries)
 
 def main():
     # File paths
@@ -103,28 +139,28 @@ def main():
         print(f"Error processing entries: {e}")
         return
     
-    # Sort entries by library name
-    sorted_entries = dict(sorted(entries.items()))
+    # Print and save formatted output, one entry block at a time
+    with open('library_cards_output.txt', 'w', buffering=1 << 16) as f:
+        def emit(text):
+            sys.stdout.write(text)
+            f.write(text)
+        
+        separator = ""
+        # Sort entries by library name
+        for library in sorted(entries):
+            for entry in entries[library]:
+                # Entries are separated by a blank line
+                emit(f"{separator}Library: {library}\n")
+                separator = "\n"
+                if entry['card']:
+                    emit(f"Card: {entry['card']}\n")
+                if entry['username']:
+                    emit(f"Username: {entry['username']}\n")
+                if entry['password']:
+                    emit(f"Password: {entry['password']}\n")
     
-    # Print and save formatted output
-    output_lines = []
-    for library, entries in sorted_entries.items():
-        for entry in entries:
-            output_lines.append(f"Library: {library}")
-            if entry['card']:
-                output_lines.append(f"Card: {entry['card']}")
-            if entry['username']:
-                output_lines.append(f"Username: {entry['username']}")
-            if entry['password']:
-                output_lines.append(f"Password: {entry['password']}")
-            output_lines.append("")
-
-    # Print to console
-    print("\n".join(output_lines))
-
-    # Save to file
-    with open('library_cards_output.txt', 'w') as f:
-        f.write("\n".join(output_lines))
+    # Keep the trailing newline print() used to add
+    sys.stdout.write("\n")
 
 if __name__ == "__main__":
     main()
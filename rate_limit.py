@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Union
+
+
+class AsyncTokenBucket:
+    """Token bucket that paces Bot API calls instead of waiting out FloodWait.
+
+    Tokens refill at `rate` per second up to `capacity`; acquire() reserves
+    the next token and sleeps until it is due, so waiters are served in
+    arrival order. The state is guarded by a threading.Lock rather than an
+    asyncio one, which lets one bucket serve any number of event loops.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, possibly going into debt, and return the wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def chat_key(chat_id: Union[str, int]) -> Union[str, int]:
+    """Normalise a chat ID so "123" and 123 share a per-chat bucket."""
+    if isinstance(chat_id, str) and chat_id.lstrip('-').isdigit():
+        return int(chat_id)
+    return chat_id
+
+
+# Stay below Telegram's limits of ~30 messages/s overall and ~1/s per chat
+GLOBAL_RATE = 25
+GLOBAL_BURST = 30
+CHAT_RATE = 0.9
+CHAT_BURST = 1
+
+
+class MessageLimiter:
+    """Global and per-chat message buckets for one Telegram account."""
+
+    def __init__(self):
+        self._global = AsyncTokenBucket(rate=GLOBAL_RATE, capacity=GLOBAL_BURST)
+        self._chats = defaultdict(
+            lambda: AsyncTokenBucket(rate=CHAT_RATE, capacity=CHAT_BURST)
+        )
+
+    async def throttle(self, chat_id: Union[str, int]) -> None:
+        """Wait for a slot under the account's global and per-chat limits."""
+        await self._global.acquire()
+        await self._chats[chat_key(chat_id)].acquire()
+
+
+# Shared by everything that sends as BOT_TOKEN's bot
+BOT_API = MessageLimiter()
+
+
+async def throttle(chat_id: Union[str, int]) -> None:
+    """Wait for a slot under the global and per-chat Bot API message limits."""
+    await BOT_API.throttle(chat_id)
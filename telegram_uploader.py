@@ -1,15 +1,591 @@
 import asyncio
+import inspect
 import logging
+import math
+import mmap
+import os
+import random
+import socket
+import threading
 import time
-from pathlib import Path
-from typing import Optional, Union, Dict, Any
-from pyrogram import Client
+from pathlib import Path, PurePath
+from typing import Optional, Union, Dict, Any, Iterable, List, AsyncIterable, Awaitable, Callable
+import mutagen
+from mutagen import MutagenError
+from pyrogram import Client, raw, utils
+from pyrogram.connection import Connection
+from pyrogram.session import Session
+import pyrogram.session.session as pyrogram_session
 from pyrogram.types import Message
-from pyrogram.errors import FloodWait, RPCError, NetworkError, TimeoutError
+from pyrogram.errors import (
+    FloodWait, FilePartMissing, RPCError, InternalServerError, ServiceUnavailable
+)
+
+from metadata import AudiobookMetadata
+from rate_limit import MessageLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# MTProto caps upload parts at 512 KB; files above 10 MB use SaveBigFilePart
+PART_SIZE = 512 * 1024
+BIG_FILE_THRESHOLD = 10 * 1024 * 1024
+# Parallel part uploads per DC that Telegram tolerates, shared by concurrent uploads
+UPLOAD_CONNECTIONS = 4
+# Pooled media sessions are pinged to keep their server salt fresh, and
+# destroyed before Telegram's one hour session lifetime runs out
+MEDIA_SESSION_CHECK_INTERVAL = 5 * 60
+MEDIA_SESSION_PING_INTERVAL = 30 * 60
+MEDIA_SESSION_MAX_IDLE = 55 * 60
+# A part Telegram answers False for is sent again this many times, with full
+# jitter backoff from PART_RETRY_BASE seconds, before the save fails
+PART_RETRIES = 3
+PART_RETRY_BASE = 0.5
+# Acknowledged parts of a failed upload are reused by a retry within this time
+PARTIAL_UPLOAD_MAX_AGE = 60 * 60
+# Minimum progress between two status edits
+PROGRESS_MIN_DELTA = 256 * 1024
+# Status updates posted this close together are sent as one edit
+EDIT_COALESCE_WINDOW = 0.1
+NS_PER_SECOND = 1_000_000_000
+# Sent with send_audio so Telegram clients stream them with proper metadata
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.m4a', '.m4b', '.aac', '.ogg', '.opus', '.flac'})
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+# (upper bound in seconds, divisor, suffix) for format_time
+TIME_UNITS = ((60, 1, 's'), (3600, 60, 'm'), (float('inf'), 3600, 'h'))
+# Transient RPC errors worth retrying; any other RPCError fails the upload at once.
+# FILE_PART_<n>_MISSING is retried too (see is_retryable), but not the other
+# FILE_PART_ errors, which mean the part itself is bad.
+RETRYABLE_RPC_PREFIXES = (
+    'RPC_CALL_FAIL',
+    'RPC_MCGET_FAIL',
+    'TIMEOUT',
+    'INTERDC_',
+    'WORKER_BUSY',
+    'MSG_WAIT_FAILED',
+)
+# Up to this fraction is added to a FloodWait so waiting uploads don't
+# all resume in the same second and trip the limit again
+FLOOD_WAIT_JITTER = 0.1
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return True if an upload that failed with `error` may succeed on retry."""
+    if not isinstance(error, RPCError):
+        return True  # Network errors and timeouts
+    if isinstance(error, (InternalServerError, ServiceUnavailable, FilePartMissing)):
+        return True
+    return str(error.ID).startswith(RETRYABLE_RPC_PREFIXES)
+
+
+def audio_attributes(path: Path) -> Dict[str, Any]:
+    """Read duration, performer and title for send_audio from the file's tags.
+
+    MP4 audiobooks go through the shared AudiobookMetadata cache; other
+    formats are read with mutagen's easy tags. Unreadable files give {}.
+    """
+    try:
+        if path.suffix.lower() in AudiobookMetadata.SUPPORTED_EXTENSIONS:
+            metadata = AudiobookMetadata.get_cached(path)
+            return {
+                'duration': int(metadata.duration_seconds),
+                'performer': metadata.get_author() or "",
+                'title': metadata.get_title()
+            }
+        audio = mutagen.File(path, easy=True)
+        if audio is None:
+            return {}
+        tags = audio.tags or {}
+        return {
+            'duration': int(audio.info.length),
+            'performer': (tags.get('artist') or [""])[0],
+            'title': (tags.get('title') or [path.stem])[0]
+        }
+    except (MutagenError, ValueError, OSError) as e:
+        logger.warning(f"Could not read audio metadata from {path}: {e}")
+        return {}
+
+
+def install_uvloop() -> bool:
+    """Use uvloop's event loop for asyncio when it is installed.
+
+    Call before the event loop is created, e.g. ahead of asyncio.run().
+    Returns True if uvloop was installed.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
+
+
+async def _save_part(session: Session, rpc) -> None:
+    """Invoke a SaveFilePart or SaveBigFilePart until Telegram accepts the part.
+
+    A False reply is retried PART_RETRIES times; after that ConnectionError
+    is raised, which is_retryable treats as transient.
+    """
+    for attempt in range(PART_RETRIES + 1):
+        if await session.invoke(rpc):
+            return
+        if attempt < PART_RETRIES:
+            await asyncio.sleep(random.uniform(0, PART_RETRY_BASE * 2 ** attempt))
+    raise ConnectionError(f"Telegram did not accept file part {rpc.file_part}")
+
+
+class NoDelayConnection(Connection):
+    """Pyrogram connection with Nagle's algorithm turned off.
+
+    asyncio only sets TCP_NODELAY on sockets created with IPPROTO_TCP,
+    and Pyrogram's are not, so small RPCs such as part acks could sit
+    behind a pending 512 KB part waiting for an ACK.
+    """
+
+    async def connect(self):
+        await super().connect()
+        try:
+            self.protocol.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError) as e:
+            logger.debug(f"Could not set TCP_NODELAY: {e}")
+
+
+# Sessions build their connections from this module global
+pyrogram_session.Connection = NoDelayConnection
+
+
+class ParallelUploadClient(Client):
+    """Pyrogram client that uploads big files over several media sessions.
+
+    The stock save_file pushes every part through a single media
+    connection and reads the file on the event loop thread. Here parts
+    are read with os.pread in the client's executor, and files above
+    BIG_FILE_THRESHOLD are spread over `upload_sessions` connections to
+    the same DC that pull part indices from a shared queue, so
+    send_document and send_audio upload parts concurrently.
+
+    Media sessions are kept in a per-DC pool between uploads instead of
+    sharing the command session, and a background task pings idle ones
+    and destroys them before they expire.
+
+    The file_id and the parts Telegram acknowledged are kept until the
+    caller reports the message as sent with forget_upload, so a retry of
+    the same unchanged file, whether its upload or the send after it
+    failed, only sends the missing parts.
+    """
+
+    def __init__(self, *args, upload_sessions: int = 4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_sessions = upload_sessions
+        self._media_sessions: Dict[int, List[Session]] = {}
+        # Session -> [last used, last pinged] in time.monotonic() seconds
+        self._media_session_times: Dict[Session, List[float]] = {}
+        self._media_session_task = None
+        # Files currently being saved by _save_file_parts
+        self._active_saves = 0
+        # (path, size, mtime_ns) -> (file_id, acked part indices, time.monotonic()),
+        # for uploads whose message hasn't been sent yet
+        self._partial_uploads: Dict[tuple, tuple] = {}
+        # Chat id or username -> resolved InputPeer
+        self._peers: Dict[Union[int, str], Any] = {}
+
+    async def stop(self, block: bool = True):
+        await self._close_media_sessions()
+        return await super().stop(block)
+
+    async def resolve_peer(self, peer_id: Union[int, str]):
+        """Resolve `peer_id` once per client, then answer from memory.
+
+        Numeric strings such as a TELEGRAM_CHAT_ID read from the environment
+        are turned into ints first; Pyrogram would otherwise look them up
+        as phone numbers and never find the stored peer.
+        """
+        if isinstance(peer_id, str) and peer_id.lstrip('-').isdigit():
+            peer_id = int(peer_id)
+        peer = self._peers.get(peer_id)
+        if peer is None:
+            peer = self._peers[peer_id] = await super().resolve_peer(peer_id)
+        return peer
+
+    def forget_upload(self, path, part: Optional[int] = None) -> None:
+        """Drop the kept parts of `path` once the message using them was sent.
+
+        With `part`, only that part is dropped, so the next save of the
+        file sends it again.
+        """
+        path = str(Path(path))
+        for key in [key for key in self._partial_uploads if key[0] == path]:
+            if part is None:
+                del self._partial_uploads[key]
+            else:
+                self._partial_uploads[key][1].discard(part)
+
+    async def save_file(
+        self,
+        path,
+        file_id: Optional[int] = None,
+        file_part: int = 0,
+        progress=None,
+        progress_args: tuple = ()
+    ):
+        # Re-sent parts and in-memory uploads keep Pyrogram's own path
+        if file_id is not None or not isinstance(path, (str, PurePath)):
+            return await super().save_file(path, file_id, file_part, progress, progress_args)
+
+        stat = os.stat(path)
+        file_size = stat.st_size
+        if file_size == 0:
+            return await super().save_file(path, file_id, file_part, progress, progress_args)
+
+        file_size_limit_mib = 4000 if self.me.is_premium else 2000
+        if file_size > file_size_limit_mib * 1024 * 1024:
+            raise ValueError(f"Can't upload files bigger than {file_size_limit_mib} MiB")
+
+        async with self.save_file_semaphore:
+            self._active_saves += 1
+            try:
+                return await self._save_file_parts(
+                    Path(path), file_size, stat.st_mtime_ns, progress, progress_args
+                )
+            finally:
+                self._active_saves -= 1
+
+    async def _save_file_parts(
+        self,
+        path: Path,
+        file_size: int,
+        mtime_ns: int,
+        progress,
+        progress_args: tuple
+    ) -> Union[raw.types.InputFile, raw.types.InputFileBig]:
+        """Upload `path` part by part, across `upload_sessions` media sessions if big.
+
+        Resumes a recent upload of the same file that wasn't sent yet, if any.
+        """
+        total_parts = math.ceil(file_size / PART_SIZE)
+        key = (str(path), file_size, mtime_ns)
+        now = time.monotonic()
+        for stale in [k for k, v in self._partial_uploads.items() if now - v[2] >= PARTIAL_UPLOAD_MAX_AGE]:
+            del self._partial_uploads[stale]
+        partial = self._partial_uploads.pop(key, None)
+        if partial is not None:
+            file_id, acked_parts, _ = partial
+            logger.info(
+                f"Resuming upload of {path.name}: {len(acked_parts)}/{total_parts} parts already sent"
+            )
+        else:
+            file_id, acked_parts = self.rnd_id(), set()
+        is_big = file_size > BIG_FILE_THRESHOLD
+        queue = asyncio.Queue()
+        for part in range(total_parts):
+            if part not in acked_parts:
+                queue.put_nowait(part)
+        # Concurrent files split UPLOAD_CONNECTIONS between them; nothing is
+        # left to send when every part was acknowledged before the send failed
+        share = max(1, UPLOAD_CONNECTIONS // self._active_saves)
+        session_count = min(self.upload_sessions if is_big else 1, share, queue.qsize())
+
+        dc_id = await self.storage.dc_id()
+        # Only the last part can be shorter than PART_SIZE
+        uploaded = sum(min(PART_SIZE, file_size - part * PART_SIZE) for part in acked_parts)
+
+        def prefetch():
+            if queue.empty():
+                return None
+            part = queue.get_nowait()
+            return part, self.loop.run_in_executor(self.executor, read_part, part)
+
+        async def worker(session: Session) -> None:
+            next_read = prefetch()
+            try:
+                while next_read is not None:
+                    part, reading = next_read
+                    chunk = await reading
+                    # Read this worker's next part while the current one is on the wire
+                    next_read = prefetch()
+                    await send_part(session, part, chunk)
+            finally:
+                if next_read is not None:
+                    # Let a pending read finish before the file is closed
+                    await asyncio.gather(next_read[1], return_exceptions=True)
+
+        async def send_part(session: Session, part: int, chunk: bytes) -> None:
+            nonlocal uploaded
+            if is_big:
+                rpc = raw.functions.upload.SaveBigFilePart(
+                    file_id=file_id,
+                    file_part=part,
+                    file_total_parts=total_parts,
+                    bytes=chunk
+                )
+            else:
+                rpc = raw.functions.upload.SaveFilePart(
+                    file_id=file_id,
+                    file_part=part,
+                    bytes=chunk
+                )
+            await _save_part(session, rpc)
+            acked_parts.add(part)
+            uploaded += len(chunk)
+            if progress:
+                if inspect.iscoroutinefunction(progress):
+                    await progress(uploaded, file_size, *progress_args)
+                else:
+                    progress(uploaded, file_size, *progress_args)
+
+        sessions = []
+        file = open(path, 'rb')
+        # pread copies each part straight into its bytes object without
+        # holding the GIL; mmap slices serve platforms that lack it (Windows)
+        mapped = None if hasattr(os, 'pread') else mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        )
+        # Not available on macOS/Windows; reads work the same without the hints
+        fadvise = getattr(os, 'posix_fadvise', None)
+        if fadvise:
+            fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        def read_part(part: int) -> bytes:
+            offset = part * PART_SIZE
+            if mapped is None:
+                return os.pread(file.fileno(), PART_SIZE, offset)
+            return mapped[offset:offset + PART_SIZE]
+
+        try:
+            if session_count:
+                sessions = await self._acquire_media_sessions(dc_id, session_count)
+            tasks = [asyncio.ensure_future(worker(session)) for session in sessions]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                # A failed session may be in any state; don't return it to the pool
+                for session in sessions:
+                    await self._close_upload_session(session)
+                if acked_parts:
+                    self._partial_uploads[key] = (file_id, acked_parts, time.monotonic())
+                raise
+            self._release_media_sessions(dc_id, sessions)
+            # Kept until forget_upload, in case sending the message fails
+            self._partial_uploads[key] = (file_id, acked_parts, time.monotonic())
+            if fadvise:
+                # Every part is saved, so the file won't be read again; drop its
+                # pages in one call so they don't push other files out of the cache
+                fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            if mapped is not None:
+                mapped.close()
+            file.close()
+
+        if is_big:
+            return raw.types.InputFileBig(id=file_id, parts=total_parts, name=path.name)
+        # The checksum is optional; Telegram only verifies it when given, and
+        # computing it would read the whole file a second time
+        return raw.types.InputFile(
+            id=file_id,
+            parts=total_parts,
+            name=path.name,
+            md5_checksum=""
+        )
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterable[bytes],
+        name: str
+    ) -> Union[raw.types.InputFile, raw.types.InputFileBig]:
+        """Upload bytes from `chunks` as they arrive, without knowing the total size.
+
+        The stream is cut into PART_SIZE parts whatever sizes the iterator
+        yields. Parts are held back until the stream passes
+        BIG_FILE_THRESHOLD; from then on every part but the last is sent
+        with file_total_parts=-1, as Telegram allows for streamed uploads,
+        so a transcoder's output can be uploaded without being written to
+        disk first. Shorter streams are sent as a small file.
+        """
+        max_parts = (4000 if self.me.is_premium else 2000) * 1024 * 1024 // PART_SIZE
+        file_id = self.rnd_id()
+        dc_id = await self.storage.dc_id()
+        queue = asyncio.Queue(maxsize=self.upload_sessions)
+        total_parts = 0
+        is_big = False
+
+        async def produce() -> None:
+            nonlocal total_parts, is_big
+            buffer = bytearray()
+            size = 0
+            # Parts not queued yet: all of them while the stream may still be
+            # small, then the newest one, since only the last carries the total
+            held = []
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                while len(buffer) >= PART_SIZE:
+                    held.append(bytes(buffer[:PART_SIZE]))
+                    del buffer[:PART_SIZE]
+                    total_parts += 1
+                    if total_parts > max_parts:
+                        raise ValueError(f"Can't upload streams bigger than {max_parts} parts")
+                is_big = is_big or size > BIG_FILE_THRESHOLD
+                if is_big:
+                    while len(held) > 1:
+                        await queue.put((total_parts - len(held), held.pop(0), -1))
+            if buffer:
+                held.append(bytes(buffer))
+                total_parts += 1
+            if not held:
+                raise ValueError("Can't upload an empty stream")
+            for part, chunk in enumerate(held, total_parts - len(held)):
+                await queue.put((part, chunk, total_parts if part == total_parts - 1 else -1))
+            for _ in sessions:
+                await queue.put(None)
+
+        async def worker(session: Session) -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                part, chunk, file_total_parts = item
+                if is_big:
+                    rpc = raw.functions.upload.SaveBigFilePart(
+                        file_id=file_id,
+                        file_part=part,
+                        file_total_parts=file_total_parts,
+                        bytes=chunk
+                    )
+                else:
+                    rpc = raw.functions.upload.SaveFilePart(
+                        file_id=file_id,
+                        file_part=part,
+                        bytes=chunk
+                    )
+                await _save_part(session, rpc)
+
+        async with self.save_file_semaphore:
+            sessions = await self._acquire_media_sessions(dc_id, self.upload_sessions)
+            tasks = [asyncio.ensure_future(produce())]
+            tasks += [asyncio.ensure_future(worker(session)) for session in sessions]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                for session in sessions:
+                    await self._close_upload_session(session)
+                raise
+            self._release_media_sessions(dc_id, sessions)
+
+        if is_big:
+            return raw.types.InputFileBig(id=file_id, parts=total_parts, name=name)
+        return raw.types.InputFile(id=file_id, parts=total_parts, name=name, md5_checksum="")
+
+    async def _acquire_media_sessions(self, dc_id: int, count: int) -> List[Session]:
+        """Take `count` started media sessions for `dc_id`, opening new ones as needed."""
+        pool = self._media_sessions.setdefault(dc_id, [])
+        sessions = [pool.pop() for _ in range(min(count, len(pool)))]
+        new_sessions = [
+            Session(
+                self, dc_id, await self.storage.auth_key(),
+                await self.storage.test_mode(), is_media=True
+            )
+            for _ in range(count - len(sessions))
+        ]
+        try:
+            await asyncio.gather(*(session.start() for session in new_sessions))
+        except BaseException:
+            for session in sessions + new_sessions:
+                await self._close_upload_session(session)
+            raise
+        now = time.monotonic()
+        for session in new_sessions:
+            self._media_session_times[session] = [now, now]
+        return sessions + new_sessions
+
+    def _release_media_sessions(self, dc_id: int, sessions: List[Session]) -> None:
+        """Return sessions to the pool and make sure the maintenance task runs."""
+        now = time.monotonic()
+        for session in sessions:
+            self._media_session_times[session][0] = now
+        self._media_sessions.setdefault(dc_id, []).extend(sessions)
+        if self._media_session_task is None or self._media_session_task.done():
+            self._media_session_task = asyncio.ensure_future(self._maintain_media_sessions())
+
+    async def _maintain_media_sessions(self) -> None:
+        """Ping pooled sessions every half hour and destroy long idle ones."""
+        while any(self._media_sessions.values()):
+            await asyncio.sleep(MEDIA_SESSION_CHECK_INTERVAL)
+            now = time.monotonic()
+            for pool in self._media_sessions.values():
+                for session in list(pool):
+                    last_used, last_pinged = self._media_session_times[session]
+                    if now - last_used > MEDIA_SESSION_MAX_IDLE:
+                        pool.remove(session)
+                        await self._close_upload_session(session)
+                    elif now - last_pinged > MEDIA_SESSION_PING_INTERVAL:
+                        try:
+                            # Waiting for the pong lets Session.send adopt a new
+                            # salt if the server answers with bad_server_salt
+                            await session.send(
+                                raw.functions.PingDelayDisconnect(
+                                    ping_id=0, disconnect_delay=Session.WAIT_TIMEOUT + 10
+                                )
+                            )
+                            self._media_session_times[session][1] = time.monotonic()
+                        except Exception as e:
+                            logger.debug(f"Dropping unresponsive media session: {e}")
+                            pool.remove(session)
+                            await self._close_upload_session(session)
+
+    async def _close_media_sessions(self) -> None:
+        """Destroy every pooled media session."""
+        if self._media_session_task is not None:
+            self._media_session_task.cancel()
+            self._media_session_task = None
+        for pool in self._media_sessions.values():
+            while pool:
+                await self._close_upload_session(pool.pop())
+
+    async def _close_upload_session(self, session: Session) -> None:
+        """Stop an auxiliary session and tell the server to forget it."""
+        self._media_session_times.pop(session, None)
+        if session.is_started.is_set():
+            await session.stop()
+        try:
+            await self.session.send(
+                raw.functions.DestroySession(
+                    session_id=int.from_bytes(session.session_id, "little", signed=True)
+                ),
+                wait_response=False
+            )
+        except Exception as e:
+            logger.debug(f"Could not destroy upload session: {e}")
+
+
+class _SharedClient:
+    """A cached client and the number of started TelegramUploaders using it."""
+
+    def __init__(self, client: ParallelUploadClient):
+        self.client = client
+        self.users = 0
+        # Serializes connecting and disconnecting between the users
+        self.lock = asyncio.Lock()
+
+
+def _client_loop() -> asyncio.AbstractEventLoop:
+    """Return the loop a Client created now is bound to."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        # Same lookup as Pyrogram's Client.__init__
+        return asyncio.get_event_loop()
+
+
+# One client per event loop and account, shared by every TelegramUploader
+# created for it; Pyrogram clients only work on the loop they were made on
+_CLIENTS: Dict[tuple, _SharedClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
 class TelegramUploader:
     """Telegram uploader implementation using Pyrogram user client.
     
@@ -20,881 +596,478 @@ class TelegramUploader:
     - FloodWait handling
     - Network error recovery
     """
+
+    # Every 20-segment progress bar, indexed by the number of filled segments
+    _BARS = tuple('█' * n + '░' * (20 - n) for n in range(21))
+    # Shared by all uploaders. Separate from rate_limit.BOT_API because the
+    # Pyrogram session can be a user account rather than BOT_TOKEN's bot
+    _limiter = MessageLimiter()
     
     def __init__(
         self,
         api_id: str,
         api_hash: str,
-        session_string: Optional[str] = None
+        session_string: Optional[str] = None,
+        max_concurrent_uploads: int = 4
     ):
         """Initialize the uploader with Telegram API credentials.
         
+        Uploaders created on the same event loop with the same credentials
+        share one client, and so one connection and session pool. It stays
+        connected until the last of them that started it calls stop.
+        
         Args:
             api_id: Telegram API ID
             api_hash: Telegram API hash 
             session_string: Optional session string for resuming previous session
+            max_concurrent_uploads: Uploads allowed in flight at once; others wait.
+                A big file started while others are uploading gets a share
+                of the UPLOAD_CONNECTIONS media connections, not all four.
         """
         self.api_id = api_id
         self.api_hash = api_hash
         self.session_string = session_string
-        self.client = Client(
-            "uploader",
-            api_id=api_id,
-            api_hash=api_hash,
-            session_string=session_string
-        )
+        loop = _client_loop()
+        key = (loop, api_id, api_hash, session_string, max_concurrent_uploads)
+        # Instances may be created from watcher threads as well as the loop
+        with _CLIENTS_LOCK:
+            # Clients of finished loops (an earlier asyncio.run) can't be reused
+            for stale in [k for k in _CLIENTS if k[0].is_closed()]:
+                del _CLIENTS[stale]
+            self._shared = _CLIENTS.get(key)
+            if self._shared is None:
+                self._shared = _CLIENTS[key] = _SharedClient(ParallelUploadClient(
+                    "uploader",
+                    api_id=api_id,
+                    api_hash=api_hash,
+                    session_string=session_string,
+                    # Pyrogram's own transfer limit matches ours
+                    max_concurrent_transmissions=max_concurrent_uploads,
+                    upload_sessions=UPLOAD_CONNECTIONS
+                ))
+            self.client = self._shared.client
         self.max_retries = 3
         self.retry_delay = 30
-    self, 
-    api_id: str,
-    api_hash: str,
-    session_string: Optional[str] = None
-):
-    """Initialize the uploader with Telegram API credentials.
-    
-    Args:
-        api_id: Telegram API ID
-        api_hash: Telegram API hash 
-        session_string: Optional session string for resuming previous session
-    """
-    self.api_id = api_id
-    self.api_hash = api_hash
-    self.session_string = session_string
-    self.client = Client(
-        "uploader",
-        api_id=api_id,
-        api_hash=api_hash,
-        session_string=session_string
-    )
-    self.max_retries = 3
-    self.retry_delay = 30
-            @staticmethod
-            def format_size(size: float) -> str:
-                """Format size in bytes to human readable format."""
-                units = ['B', 'KB', 'MB', 'GB', 'TB']
-                size = float(size)
-                unit_index = 0
-                
-                while size >= 1024.0 and unit_index < len(units) - 1:
-                    size /= 1024.0
-                    unit_index += 1
-                
-                return f"{size:.2f} {units[unit_index]}"
-
-            @staticmethod
-            def format_time(seconds: float) -> str:
-                """Format time duration in seconds to human readable format."""
-                if seconds < 60:
-                    return f"{seconds:.1f}s"
-                elif seconds < 3600:
-                    minutes = seconds / 60
-                    return f"{minutes:.1f}m"
-                else:
-                    hours = seconds / 3600
-                    return f"{hours:.1f}h"
-
-            def _init_upload_state(self, file_size: int) -> Dict[str, Any]:
-                """Initialize the upload state dictionary for progress tracking.
-                
-                Args:
-                    file_size: Size of the file in bytes
-                    
-                Returns:
-                    Dict containing upload state information
-                """
-                return {
-                    'start_time': time.time(),
-                    'last_progress_update': 0,
-                    'uploaded_bytes': 0,
-                    'file_size': file_size
-                }
-    async def _progress_callback(
-        self,
-        current: int,
-        total: int,
-        message: Message,
-        state: Dict[str, Any]
-    ) -> None:
-        """Update progress message with current upload status.
-        
-        Args:
-            current: Current number of bytes uploaded
-            total: Total file size in bytes
-            message: Message to update with progress
-            state: Upload state dictionary
-        """
-        try:
-            now = time.time()
-            # Limit progress updates to once per second
-            if now - state['last_progress_update'] < 1:
-                return
-                
-            if current == total:
-                await message.edit_text("Finalizing upload...")
-                return
-            
-            state['last_progress_update'] = now
-            elapsed = now - state['start_time']
-            speed = current / elapsed if elapsed > 0 else 0
-            percentage = (current * 100) / total
-            remaining = (total - current) / speed if speed > 0 else 0
-            
-            # Create progress bar
-            bars = int(percentage / 5)  # 20 bars total
-            progress_bar = '█' * bars + '░' * (20 - bars)
-            
-            status_text = (
-                f"\U0001F4E4 Uploading...\n"
-                f"Progress: {progress_bar} {percentage:.1f}%\n"
-                f"Speed: {self.format_size(speed)}/s\n"
-                f"Uploaded: {self.format_size(current)}/{self.format_size(total)}\n"
-                f"Elapsed: {self.format_time(elapsed)}\n"
-                f"Remaining: {self.format_time(remaining)}"
-            )
-            
-            await message.edit_text(status_text)
-            
-        except Exception as e:
-                             await progress_message.edit_text(error_msg)
-                            await asyncio.sleep(wait_time)
-                        else:
-                            raise
-        
-            return None
-            
-        except Exception as e:
-            error_msg = f"❌ Upload failed: {str(e)}"
-            logger.error(error_msg)
-            if 'progress_message' in locals():
-                await progress_message.edit_text(error_msg)
-            raise
-        """Upload a file to Telegram with progress tracking and automatic retries.
-        
-        Features:
-        - Supports files up to 2GB
-        - Progress tracking with ETA
-        - Automatic retries with exponential backoff
-        - Rate limit handling
-        
-        Args:
-            file_path: Path to file to upload
-            chat_id: Telegram chat ID
-            caption: Optional caption for the file
-            **kwargs: Additional arguments passed to send_document
-
-            Returns:
-                Optional[Message]: The sent message if successful
+        self.max_concurrent_uploads = max_concurrent_uploads
+        self._upload_semaphore = None  # Created on first use, inside the running loop
+        self._started = False
 
-            Raises:
-                FileNotFoundError: If file doesn't exist
-                RPCError: For Telegram API errors
-            """
-            file_path = Path(file_path)
-            if not file_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-                
-            file_size = file_path.stat().st_size
-            state = self._init_upload_state(file_size)
+    async def start(self) -> None:
+        """Connect and authorize the client once for all later uploads.
 
-            try:
-                async with self.client:
-                    # Send initial progress message
-                    progress_message = await self.client.send_message(
-                        chat_id=chat_id,
-                        text=f"Starting upload of {file_path.name} ({self.format_size(file_size)})..."
-                    )
-                    
-                    retry_count = 0
-                    while retry_count < self.max_retries:
-                        try:
-                            # Upload with progress tracking
-                            result = await self.client.send_document(
-                                chat_id=chat_id,
-                                document=str(file_path),
-                                caption=caption,
-                                force_document=True,
-                                progress=self._progress_callback,
-                                progress_args=(progress_message, state),
-                                **kwargs
-                            )
-                            
-                            # Upload successful
-                            await progress_message.edit_text(
-                                f"✅ Upload complete: {file_path.name}\n"
-                                f"Time taken: {self.format_time(time.time() - state['start_time'])}"
-                            )
-                            return result
-                            
-                        except FloodWait as e:
-                            # Handle rate limiting
-                            logger.warning(f"Rate limit hit, waiting {e.value}s...")
-                            await progress_message.edit_text(
-                                f"⏳ Rate limit hit, waiting {e.value} seconds..."
-                            )
-                            await asyncio.sleep(e.value)
-                            continue
-                            
-                        except (NetworkError, TimeoutError, RPCError) as e:
-                            retry_count += 1
-                            if retry_count < self.max_retries:
-                                wait_time = min(1800, self.retry_delay * (2 ** (retry_count - 1)))
-                                error_msg = (
-                                    f"⚠️ Upload error (attempt {retry_count}/{self.max_retries})\n"
-                                    f"Error: {str(e)}\n"
-                                    f"Retrying in {self.format_time(wait_time)}..."
-                                )
-                                logger.warning(error_msg)
-                                await progress_message.edit_text(error_msg)
-                                await asyncio.sleep(wait_time)
-                            else:
-                                raise
-                
-                return None
-                
-            except Exception as e:
-                error_msg = f"❌ Upload failed: {str(e)}"
-                logger.error(error_msg)
-                if 'progress_message' in locals():
-                    await progress_message.edit_text(error_msg)
-                raise
-                                retry_count = 0
-                                while retry_count < self.max_retries:
-                                    try:
-                                        # Upload the file
-                                        async with aiofiles.open(file_path, 'rb') as file:
-                            result = await self.client.send_document(
-                                chat_id=chat_id,
-                                document=file,
-                                caption=caption,
-                                force_document=True,
-                                progress=self._upload_progress_callback,
-                                progress_args=(progress_message,),
-                                **kwargs
-                            )
-                            
-                            # Upload successful
-                            await progress_message.edit_text(
-                                f"✅ Upload complete: {file_path.name}\n"
-                                f"Time taken: {self._format_time(time.time() - start_time)}"
-                            )
-                            return result
-                            
-                    except FloodWait as e:
-                        # Handle rate limiting
-                        logger.warning(f"Rate limit hit, waiting {e.value}s...")
-                        await progress_message.edit_text(
-                            f"⏳ Rate limit hit, waiting {e.value} seconds..."
-                        )
-                        await asyncio.sleep(e.value)
-                        continue
-                        
-                    except (NetworkError, TimeoutError) as e:
-                        retry_count += 1
-                        if retry_count < self.max_retries:
-                            wait_time = min(1800, self.retry_delay * (2 ** (retry_count - 1)))
-                            error_msg = (
-                                f"⚠️ Upload error (attempt {retry_count}/{self.max_retries})\n"
-                                f"Error: {str(e)}\n"
-                                f"Retrying in {wait_time}s..."
-                            )
-                            logger.warning(error_msg)
-                            await progress_message.edit_text(error_msg)
-                            await asyncio.sleep(wait_time)
-                        else:
-                            raise
-                            
-            return None
-            
-        except Exception as e:
-            error_msg = f"❌ Upload failed: {str(e)}"
-            logger.error(error_msg)
-            if 'progress_message' in locals():
-                await progress_message.edit_text(error_msg)
-            raise
-
-    async def _progress_callback(
-        self,
-        current: int,
-        total: int,
-        message: Message,
-        state: Dict[str, Any]
-    ) -> None:
-        """Update progress message with current upload status.
-        
-        Displays:
-        - Progress bar
-        - Percentage complete
-        - Upload speed
-        - ETA
-        - File size progress
-        """
-        try:
-            if current == total:
-                await message.edit_text("Finalizing upload...")
-                return
-            
-            now = time.time()
-            elapsed = now - start_time
-            speed = current / elapsed if elapsed > 0 else 0
-            percentage = (current * 100) / total
-            time_remaining = (total - current) / speed if speed > 0 else 0
-            
-            # Create progress bar
-            bars = int(percentage / 5)  # 20 bars total
-            progress_bar = '█' * bars + '░' * (20 - bars)
-            
-            status_text = (
-                f"📤 Uploading...\n"
-                f"Progress: {progress_bar} {percentage:.1f}%\n"
-                f"Speed: {self.format_size(speed)}/s\n"
-                f"Uploaded: {self.format_size(current)}/{self.format_size(total)}\n"
-                f"Elapsed: {self.format_time(elapsed)}\n"
-                f"Remaining: {self.format_time(time_remaining)}"
-            )
-            
-            # Update progress message
-            await message.edit_text(status_text)
-            
-        except Exception as e:
-            logger.error(f"Progress callback error: {e}")
-            
-            # Calculate progress metrics
-            elapsed = now - self.start_time if hasattr(self, 'start_time') else 0
-            speed = current / elapsed if elapsed > 0 else 0
-            percentage = (current * 100) / total
-            
-            # Create progress string
-            progress_str = '█' * int(percentage / 5) + '░' * (20 - int(percentage / 5))
-            
-            text = (
-                f"\U0001F4E4 Uploading...\n"
-                f"Progress: {progress_str} {percentage:.1f}%\n"
-                f"Speed: {self._format_size(speed)}/s\n"
-                f"Uploaded: {self._format_size(current)}/{self._format_size(total)}"
-            )
-            
-            await message.edit_text(text)
-            
-        except Exception as e:
-            logger.error(f"Progress callback error: {e}")
-            
-            # Create progress string
-            progress_str = '█' * int(percentage / 5) + '░' * (20 - int(percentage / 5))
-            
-            text = (
-                f"\U0001F4E4 Uploading...\n"
-                f"Progress: {progress_str} {percentage:.1f}%\n"
-                f"Speed: {self.format_size(speed)}/s\n"
-                f"Uploaded: {self.format_size(current)}/{self.format_size(total)}\n"
-                f"Elapsed: {self.format_time(elapsed)}\n"
-                f"Remaining: {self.format_time(remaining)}"
-            )
-            
-            await message.edit_text(text)
-            
-        except Exception as e:
-            logger.error(f"Progress callback error: {e}")
-        """Internal progress callback handler with rate limiting and error handling.
-        
-        Args:
-            current: Current number of bytes uploaded
-            total: Total file size in bytes
-            state: Upload state dictionary
-            message: Telegram message for progress updates
-            progress_callback: Optional external progress callback
+        Keeping the session open avoids a fresh MTProto handshake and
+        authorization per file, like reusing an httpx.Client.
         """
-        try:
-            now = time.time()
-            # Limit progress updates to once per second
-            if now - state['last_progress_update'] < 1:
-                return
-                
-            state['last_progress_update'] = now
-            state['uploaded_bytes'] = current
-            
-            # Calculate progress metrics
-            elapsed = now - state['start_time']
-            speed = current / elapsed if elapsed > 0 else 0
-            percentage = (current * 100) / total
-            remaining = (total - current) / speed if speed > 0 else 0
-            
-            # Create progress string
-            progress_bars = int(percentage / 5)  # 20 bars total
-            progress_str = '█' * progress_bars + '░' * (20 - progress_bars)
-            
-            text = (
-                f"📤 Uploading...\n"
-                f"Progress: {progress_str} {percentage:.1f}%\n"
-                f"Speed: {self.format_size(speed)}/s\n"
-                f"Uploaded: {self.format_size(current)}/{self.format_size(total)}\n"
-                f"Elapsed: {self.format_time(elapsed)}\n"
-                f"Remaining: {self.format_time(remaining)}"
-            )
-            
-            # Update progress message
-            await message.edit_text(text)
-            
-            # Call external progress callback if provided
-            if progress_callback:
-                progress_callback(current, total, speed, {
-                    'percentage': percentage,
-                    'elapsed': elapsed,
-                    'remaining': remaining,
-                    'speed': speed
-                })
-                
-        except Exception as e:
-            logger.error(f"Progress callback error: {e}")
+        if self._started:
+            return
+        async with self._shared.lock:
+            if not self.client.is_connected:
+                await self.client.start()
+            self._shared.users += 1
+        self._started = True
 
-        try:
-            if current == total:
-                await message.edit_text("Upload completed!")
-                return
-            
-            elapsed_time = time.time() - self.start_time
-            if elapsed_time == 0:
-                return
+    async def stop(self) -> None:
+        """Release the client taken by `start`; the last user disconnects it."""
+        if not self._started:
+            return
+        self._started = False
+        async with self._shared.lock:
+            self._shared.users -= 1
+            if self._shared.users == 0 and self.client.is_connected:
+                await self.client.stop()
 
-            speed = current / elapsed_time
-            percentage = (current * 100) / total
-            estimated_total = total / speed if speed > 0 else 0
-            time_remaining = estimated_total - elapsed_time if estimated_total > elapsed_time else 0
-            
-            progress_bars = int(percentage / 5)  # 20 bars for 100%
-            progress_str = '█' * progress_bars + '░' * (20 - progress_bars)
+    async def __aenter__(self) -> "TelegramUploader":
+        await self.start()
+        return self
 
-            text = f"\U0001F4E4 Uploading...\n"
-            text += f"Progress: {progress_str} {percentage:.1f}%\n"
-            text += f"Speed: {self.format_size(speed)}/s\n"
-            text += f"Uploaded: {self.format_size(current)}/{self.format_size(total)}\n"
-            
-            if time_remaining > 0:
-                text += f"Time remaining: {time_remaining:.1f}s"
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
 
-            await message.edit_text(text)
-        except Exception as e:
-            logger.error(f"Progress callback error: {e}")
+    async def _throttle(self, chat_id: Union[str, int]) -> None:
+        """Wait for a slot under the global and per-chat message limits."""
+        await self._limiter.throttle(chat_id)
 
-    async def upload_file(
+    async def _retry(
         self,
-        file_path: Union[str, Path],
-        chat_id: Union[str, int],
-        caption: Optional[str] = None,
-        **kwargs
-    ) -> Optional[Message]:
-        """Upload a file to Telegram with progress tracking and error handling.
-        
-        Args:
-            file_path: Path to file to upload
-            chat_id: Telegram chat ID
-            caption: Optional caption for the file
-            **kwargs: Additional arguments passed to send_document
-            
-        Returns:
-            Optional[Message]: The sent message if successful
-            
-        Raises:
-            FileNotFoundError: If file doesn't exist
-            NetworkError: For network related errors
-        """
-            logger.error(error_msg)
-            if 'progress_message' in locals():
-                await progress_message.edit_text(error_msg)
-            raise
-            
-        return None
-        """Upload a file to Telegram with robust error handling and progress tracking.
-        
-        Features:
-        - Chunked upload for large files
-        - Automatic retries with exponential backoff
-        - Progress tracking
-        - Timeout handling
-        - Memory efficient
-        self,
-        file_path: Union[str, Path],
-        chat_id: Union[str, int],
-        caption: Optional[str] = None,
-        progress_callback: Optional[ProgressCallback] = None,
-        **kwargs
-    ) -> Optional[Message]:
-        """Upload a file to Telegram with robust error handling and progress tracking.
-        
-        Args:
-            file_path: Path to file to upload
-            chat_id: Telegram chat ID
-            caption: Optional caption for the file
-            progress_callback: Optional callback for progress updates
-            **kwargs: Additional arguments passed to send_document
-            
-        Returns:
-            Optional[Message]: The sent message if successful
-            
-        Raises:
-            FileNotFoundError: If file doesn't exist
-            NetworkError: For network related errors
-        """
-        file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-            
-        file_size = file_path.stat().st_size
-        start_time = time.time()
-        
-        try:
-            async with self.client:
-                # Send initial progress message
-                progress_message = await self.client.send_message(
-                    chat_id=chat_id,
-                    text=f"Starting upload of {file_path.name} ({self.format_size(file_size)})..."
-                )
-                
-                retry_count = 0
-                while retry_count < self.max_retries:
-                    try:
-                        # Upload the file
-                        async with aiofiles.open(file_path, 'rb') as file:
-                            result = await self.client.send_document(
-                                chat_id=chat_id,
-                                document=file,
-                                caption=caption,
-                                force_document=True,
-                                progress=progress_callback,
-                                **kwargs
-                            )
-                            
-                            # Upload successful
-                            await progress_message.edit_text(
-                                f"✅ Upload complete: {file_path.name}\n"
-                                f"Time taken: {time.time() - start_time:.1f}s"
-                            )
-                            return result
-                            
-                    except FloodWait as e:
-                        # Handle rate limiting
-                        logger.warning(f"Rate limit hit, waiting {e.value}s...")
-                        await progress_message.edit_text(
-                            f"⏳ Rate limit hit, waiting {e.value} seconds..."
-                        )
-                        await asyncio.sleep(e.value)
-                        continue
-                        
-                    except (NetworkError, TimeoutError) as e:
-                        retry_count += 1
-                        if retry_count < self.max_retries:
-                            wait_time = min(1800, self.retry_delay * (2 ** (retry_count - 1)))
-                            error_msg = (
-                                f"⚠️ Upload error (attempt {retry_count}/{self.max_retries})\n"
-                                f"Error: {str(e)}\n"
-                                f"Retrying in {wait_time}s..."
-                            )
-                            logger.warning(error_msg)
-                            await progress_message.edit_text(error_msg)
-                            await asyncio.sleep(wait_time)
-                        else:
-                            raise
-                            
-            return None
-            
-        except Exception as e:
-            error_msg = f"❌ Upload failed: {str(e)}"
-            logger.error(error_msg)
-            if 'progress_message' in locals():
-                await progress_message.edit_text(error_msg)
-            raise
-        self,
-        file_path: Union[str, Path],
-        chat_id: Union[str, int],
-        caption: Optional[str] = None,
-        progress_callback: Optional[ProgressCallback] = None,
-        state_callback: Optional[StateCallback] = None,
-        chunk_size: int = 8388608,  # 8MB chunks
-        max_retries: int = 3,
-        **kwargs
-    ) -> Optional[Message]:
-        """Upload a file to Telegram with robust error handling and progress tracking.
-        
-        Features:
-        - Chunked upload for large files
-        - Automatic retries with exponential backoff
-        - Progress tracking
-        - Timeout handling
-        - Memory efficient streaming
-        
-        Args:
-            file_path: Path to file to upload
-            chat_id: Telegram chat ID
-            caption: Optional caption for the file
-            progress_callback: Optional callback for progress updates
-            state_callback: Optional callback for state changes
-            chunk_size: Size of upload chunks in bytes
-            max_retries: Maximum number of retry attempts
-            **kwargs: Additional arguments passed to send_document
-            
-        Returns:
-            Optional[Message]: The sent message if successful
-            
-        Raises:
-            FileNotFoundError: If file doesn't exist
-            TelegramError: For Telegram API errors
-            NetworkError: For network related errors
+        call: Callable[[], Awaitable[Any]],
+        action: str,
+        notify: Optional[Callable[[str], None]] = None
+    ) -> Any:
+        """Await `call()` until it succeeds, under the uploader's retry policy.
+
+        FloodWait is slept out with FLOOD_WAIT_JITTER and doesn't use up an
+        attempt. Errors that is_retryable accepts are retried up to
+        max_retries attempts with full jitter exponential backoff; any
+        other error is raised. `notify` gets a status text before each wait.
         """
-        # Path handling
-        file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-            
-        # Initialize state
-        file_size = file_path.stat().st_size
-        state = self.__init_upload_state(file_size)
-        
-        # Calculate appropriate timeouts
-        timeouts = self.calculate_timeouts(file_size)
-        kwargs.update(timeouts)
-        
-        try:
-            async with self.client:
-                # Send initial progress message
-                progress_message = await self.client.send_message(
-                    chat_id=chat_id,
-                    text=f"Preparing to upload {file_path.name} ({self.format_size(file_size)})..."
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except FloodWait as e:
+                wait_time = e.value * (1 + random.random() * FLOOD_WAIT_JITTER)
+                logger.warning(f"Rate limit hit, waiting {wait_time:.1f}s...")
+                status = f"⏳ Rate limit hit, waiting {self.format_time(wait_time)}..."
+            except (OSError, asyncio.TimeoutError, RPCError) as e:
+                attempt += 1
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                # Full jitter keeps restarted bots from retrying in lockstep
+                max_wait = min(1800, self.retry_delay * (2 ** (attempt - 1)))
+                wait_time = random.uniform(0, max_wait)
+                logger.warning(
+                    f"{action} error (attempt {attempt}/{self.max_retries}): {e}; "
+                    f"retrying in {wait_time:.1f}s (backoff cap {max_wait}s)"
                 )
-                
-                # Main upload loop with retries
-                while state['retries'] < max_retries:
-                    try:
-                        # Stream file in chunks
-                        async with aiofiles.open(file_path, 'rb') as file:
-                            result = await self.client.send_document(
-                                chat_id=chat_id,
-                                document=file,
-                                caption=caption,
-                                force_document=True,
-                                progress=lambda current, total: self._progress_callback(
-                                    current, total, state, progress_message, progress_callback
-                                ),
-                                **kwargs
-                            )
-                            
-                            # Upload successful
-                            await progress_message.edit_text(
-                                f"✅ Upload complete: {file_path.name}\n"
-                                f"Time taken: {self.format_time(time.time() - state['start_time'])}"
-                            )
-                            return result
-                            
-                    except FloodWait as e:
-                        # Handle rate limiting
-                        wait_time = e.value
-                        logger.warning(f"Rate limit hit, waiting {wait_time}s...")
-                        await progress_message.edit_text(
-                            f"⏳ Rate limit hit, waiting {wait_time} seconds..."
-                        )
-                        await asyncio.sleep(wait_time)
-                        continue
-                        
-                    except (NetworkError, TimeoutError) as e:
-                        # Handle network errors with exponential backoff
-                        state['retries'] += 1
-                        if state['retries'] < max_retries:
-                            wait_time = min(1800, 60 * (2 ** (state['retries'] - 1)))
-                            error_msg = (
-                                f"⚠️ Upload error (attempt {state['retries']}/{max_retries})\n"
-                                f"Error: {str(e)}\n"
-                                f"Retrying in {self.format_time(wait_time)}..."
-                            )
-                            logger.warning(error_msg)
-                            await progress_message.edit_text(error_msg)
-                            await asyncio.sleep(wait_time)
-                        else:
-                            raise
-                            
-            return None
-            
-        except Exception as e:
-            error_msg = f"❌ Upload failed: {str(e)}"
-            logger.error(error_msg)
-            if 'progress_message' in locals():
-                await progress_message.edit_text(error_msg)
-            raise
-        """Upload a file to Telegram with automatic type detection.
+                status = (
+                    f"⚠️ {action} error (attempt {attempt}/{self.max_retries})\n"
+                    f"Error: {str(e)}\n"
+                    f"Retrying in {self.format_time(wait_time)}..."
+                )
+            if notify is not None:
+                notify(status)
+            await asyncio.sleep(wait_time)
+
+    @staticmethod
+    def format_size(size: float) -> str:
+        """Format size in bytes to human readable format."""
+        if size < 1024:
+            return f"{size:.2f} B"
+        # Each unit is 2**10 of the previous one, so the bit length picks it
+        unit_index = min(len(SIZE_UNITS) - 1, (int(size).bit_length() - 1) // 10)
+        return f"{size / (1 << (unit_index * 10)):.2f} {SIZE_UNITS[unit_index]}"
+
+    @staticmethod
+    def format_time(seconds: float) -> str:
+        """Format time duration in seconds to human readable format."""
+        divisor, suffix = next(
+            ((divisor, suffix) for limit, divisor, suffix in TIME_UNITS if seconds < limit),
+            TIME_UNITS[-1][1:]
+        )
+        return f"{seconds / divisor:.1f}{suffix}"
+
+    def _init_upload_state(self, file_size: int) -> Dict[str, Any]:
+        """Initialize the upload state dictionary for progress tracking.
         
         Args:
-            file_path: Path to the file
-            chat_id: Telegram chat ID
-            caption: Optional caption for the file
-            force_document: Force sending as document regardless of type
-        
+            file_size: Size of the file in bytes
+            
         Returns:
-            Optional[Message]: Message object if successful
+            Dict containing upload state information
         """
-        if isinstance(file_path, str):
-            file_path = Path(file_path)
-
-        if not file_path.exists():
-            logger.error(f"File not found: {file_path}")
-            return None
+        start_ns = time.monotonic_ns()
+        return {
+            'start_ns': start_ns,
+            # Seeded a second back so the first tick is never throttled
+            'last_progress_update_ns': start_ns - NS_PER_SECOND,
+            'last_reported_bytes': 0,
+            'last_percentage_bucket': -1,
+            'progress_queue': None,
+            'last_text': None,
+            'uploaded_bytes': 0,
+            'file_size': file_size,
+            # Pyrogram reports progress against file_size, so these are fixed per upload
+            'percent_per_byte': 100 / file_size if file_size else 0.0,
+            'total_text': self.format_size(file_size)
+        }
 
+    @staticmethod
+    def _post_status(state: Dict[str, Any], item: Union[str, tuple]) -> None:
+        """Hand a progress snapshot or status text to the drain task, newest wins."""
+        queue = state['progress_queue']
+        if queue is None:
+            return
         try:
-            async with self.client:
-                # Send initial message
-                progress_message = await self.client.send_message(
-                    chat_id=chat_id,
-                    text=f"Starting upload of {file_path.name}..."
-                )
-
-                self.start_time = time.time()
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            queue.get_nowait()
+            queue.put_nowait(item)
 
-                # Determine upload method based on file type
-                if force_document:
-                    upload_method = self.client.send_document
-                else:
-                    upload_method = self.get_telegram_method(file_path)
-
-                # Upload the file
-                result = await upload_method(
-                    chat_id=chat_id,
-                    document=str(file_path) if upload_method == self.client.send_document else str(file_path),
-                    caption=caption,
-                    progress=self.progress,
-                    progress_args=(progress_message,)
-                )
+    async def _progress_drain(
+        self,
+        queue: asyncio.Queue,
+        message: Message,
+        state: Dict[str, Any]
+    ) -> None:
+        """Apply queued status updates to `message` until cancelled.
 
-                await progress_message.edit_text(
-                    f"Upload complete: {file_path.name}"
-                )
-                return result
+        Runs beside the upload so a slow edit_text round-trip never stalls
+        Pyrogram's part uploads; updates queued meanwhile collapse into one.
+        """
+        while True:
+            item = await queue.get()
+            # A newer update within the window replaces this one
+            await asyncio.sleep(EDIT_COALESCE_WINDOW)
+            if not queue.empty():
+                item = queue.get_nowait()
+            text = item if isinstance(item, str) else self._format_progress(*item, state)
+            # Telegram rejects an edit that doesn't change the text anyway
+            if text == state['last_text']:
+                continue
+            try:
+                await self._throttle(state['chat_id'])
+                await message.edit_text(text)
+                state['last_text'] = text
+            except Exception as e:
+                logger.error(f"Progress update failed: {e}")
 
-        except FloodWait as e:
-            retry_delay = e.value
-            logger.warning(f"Rate limit hit, waiting {retry_delay} seconds")
-            await asyncio.sleep(retry_delay)
-            return await self.upload_file(file_path, chat_id, caption, force_document)
-        except Exception as e:
-            logger.error(f"Upload failed: {e}")
-            if 'progress_message' in locals():
-                try:
-                    await progress_message.edit_text(
-                        f"Upload failed: {str(e)}"
-                    )
-                except Exception:
-                    pass
-            return None
+    def _format_progress(
+        self,
+        current: int,
+        total: int,
+        now_ns: int,
+        state: Dict[str, Any]
+    ) -> str:
+        """Build the progress status text for a (current, total, now_ns) snapshot."""
+        elapsed_ns = max(now_ns - state['start_ns'], 1)
+        speed = current * NS_PER_SECOND // elapsed_ns  # bytes/s
+        percentage = current * state['percent_per_byte']
+        remaining = (total - current) / speed if speed > 0 else 0
+        elapsed = elapsed_ns / NS_PER_SECOND
+        
+        progress_bar = self._BARS[min(20, int(percentage) // 5)]
+        
+        return (
+            f"\U0001F4E4 Uploading...\n"
+            f"Progress: {progress_bar} {percentage:.1f}%\n"
+            f"Speed: {self.format_size(speed)}/s\n"
+            f"Uploaded: {self.format_size(current)}/{state['total_text']}\n"
+            f"Elapsed: {self.format_time(elapsed)}\n"
+            f"Remaining: {self.format_time(remaining)}"
+        )
 
-    async def send_message(
+    async def _progress_callback(
         self,
-        chat_id: Union[str, int],
-        text: str
-    ) -> Optional[Message]:
-        """Send a text message to a Telegram chat.
+        current: int,
+        total: int,
+        message: Message,
+        state: Dict[str, Any]
+    ) -> None:
+        """Queue a progress update for the upload's status message.
         
         Args:
-            chat_id: Telegram chat ID
-            text: Message text to send
-            
-        Returns:
-            Optional[Message]: The sent message if successful
+            current: Current number of bytes uploaded
+            total: Total file size in bytes
+            message: Message to update with progress
+            state: Upload state dictionary
         """
         try:
-            async with self.client:
-                return await self.client.send_message(
-                    chat_id=chat_id,
-                    text=text
-                )
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}")
-            return None
-            async with self.client:
-                return await self.client.send_message(
-                    chat_id=chat_id,
-                    text=text,
-                    disable_web_page_preview=True
-                )
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}")
-            if retry and isinstance(e, FloodWait):
-                await asyncio.sleep(e.value)
-                return await self.send_message(chat_id, text, retry=False)
-            return None
-            async with self.client:
-                return await self.client.send_message(
-                    chat_id=chat_id,
-                    text=text,
-                    disable_web_page_preview=True
-                )
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}")
-            if retry and isinstance(e, FloodWait):
-                await asyncio.sleep(e.value)
-                return await self.send_message(chat_id, text, retry=False)
-            return None
+            if current == total:
+                # Always shown, however soon after the last update it comes
+                self._post_status(state, "Finalizing upload...")
+                return
 
+            now_ns = time.monotonic_ns()
+            # Limit progress updates to once per second
+            if now_ns - state['last_progress_update_ns'] < NS_PER_SECOND:
+                return
+            
+            # Skip ticks that moved less than PROGRESS_MIN_DELTA or stayed in the same percent
+            bucket = current * 100 // total
+            if (bucket == state['last_percentage_bucket']
+                    or current - state['last_reported_bytes'] < PROGRESS_MIN_DELTA):
+                return
 
+            state['last_progress_update_ns'] = now_ns
+            state['last_reported_bytes'] = current
+            state['last_percentage_bucket'] = bucket
+            self._post_status(state, (current, total, now_ns))
+            
+        except Exception as e:
+            logger.error(f"Progress callback error: {e}")
 
     async def upload_file(
         self,
         file_path: Union[str, Path],
         chat_id: Union[str, int],
         caption: Optional[str] = None,
-        progress_callback: Optional[ProgressCallback] = None,
-        state_callback: Optional[StateCallback] = None,
+        show_progress: bool = True,
+        progress_callback: Optional[Callable[[int, int], Any]] = None,
         **kwargs
     ) -> Optional[Message]:
-        """Upload a file to Telegram with robust error handling and progress tracking.
+        """Upload a file to Telegram with progress tracking and automatic retries.
         
         Features:
-        - Chunked upload for large files
+        - Supports files up to 2GB
+        - Progress tracking with ETA
         - Automatic retries with exponential backoff
-        - Progress tracking
-        - Timeout handling
-        - Memory efficient streaming
+        - Rate limit handling
         
         Args:
             file_path: Path to file to upload
             chat_id: Telegram chat ID
             caption: Optional caption for the file
-            progress_callback: Optional callback for progress updates
-            state_callback: Optional callback for state changes
-            chunk_size: Size of upload chunks in bytes
-            max_retries: Maximum number of retry attempts
+            show_progress: Post and edit a progress message in the chat
+            progress_callback: Called with (uploaded bytes, total bytes) as
+                parts are acknowledged; may be a coroutine function
             **kwargs: Additional arguments passed to send_document
-            
+
         Returns:
             Optional[Message]: The sent message if successful
+
+        Audio files (see AUDIO_EXTENSIONS) are sent with send_audio and their
+        tagged duration, performer and title unless force_document=True is
+        passed.
+
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            RPCError: For Telegram API errors
         """
-        # Path handling
         file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+        if (file_path.suffix.lower() in AUDIO_EXTENSIONS
+                and not kwargs.pop('force_document', False)):
+            # mutagen does blocking reads, keep them off the event loop
+            attributes = await asyncio.get_running_loop().run_in_executor(
+                None, audio_attributes, file_path
+            )
+            attributes.update(kwargs)
+            return await self.upload_audio(
+                file_path, chat_id, caption=caption, show_progress=show_progress,
+                progress_callback=progress_callback, **attributes
+            )
+
+        kwargs.pop('force_document', None)
+        return await self._upload(
+            self.client.send_document,
+            file_path,
+            chat_id,
+            document=str(file_path),
+            file_name=file_path.name,
+            caption=caption,
+            force_document=True,
+            show_progress=show_progress,
+            progress_callback=progress_callback,
+            **kwargs
+        )
+
+    async def _upload(
+        self,
+        send_media,
+        file_path: Path,
+        chat_id: Union[str, int],
+        show_progress: bool = True,
+        progress_callback: Optional[Callable[[int, int], Any]] = None,
+        **media_kwargs
+    ) -> Optional[Message]:
+        """Run `send_media` with a progress message and the retry policy.
 
+        Shared by upload_file and upload_audio; `media_kwargs` are passed
+        through to the Pyrogram send method. With `show_progress` off no
+        progress message is sent, and without `progress_callback` as well
+        Pyrogram gets no progress callback.
+        """
         try:
-            async with self.client:
-                # Send initial message
-                progress_message = await self.client.send_message(
-                    chat_id=chat_id,
-                    text=f"Starting upload of {file_path.name}..."
-                )
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}") from None
 
-                self.start_time = time.time()
+        state = self._init_upload_state(file_size)
+        state['chat_id'] = chat_id
+
+        drain_task = progress_message = None
+        try:
+            if not self._started:
+                await self.start()
 
-                # Upload the file
-                result = await self.client.send_document(
-                    chat_id=chat_id,
-                    document=str(file_path),
-                    force_document=True,
-                    progress=self.progress,
-                    progress_args=(progress_message,)
+            if show_progress:
+                # Send initial progress message
+                await self._throttle(chat_id)
+                try:
+                    progress_message = await self.client.send_message(
+                        chat_id=chat_id,
+                        text=f"Starting upload of {file_path.name} ({self.format_size(file_size)})..."
+                    )
+                except RPCError as e:
+                    # Nobody would see the edits, upload without them
+                    logger.warning(f"Could not send progress message, uploading without progress: {e}")
+            if progress_message is not None:
+                state['progress_queue'] = asyncio.Queue(maxsize=1)
+                drain_task = asyncio.ensure_future(
+                    self._progress_drain(state['progress_queue'], progress_message, state)
                 )
+                progress, progress_args = self._progress_callback, (progress_message, state)
+            else:
+                progress, progress_args = None, ()
+            if progress_callback is not None:
+                status_progress, status_args = progress, progress_args
+
+                async def report(current: int, total: int) -> None:
+                    if inspect.iscoroutinefunction(progress_callback):
+                        await progress_callback(current, total)
+                    else:
+                        progress_callback(current, total)
+                    if status_progress is not None:
+                        await status_progress(current, total, *status_args)
+
+                progress, progress_args = report, ()
+            
+            if self._upload_semaphore is None:
+                self._upload_semaphore = asyncio.Semaphore(self.max_concurrent_uploads)
 
-                return result
+            async def send():
+                # Only the transfer holds a slot, not backoff sleeps
+                async with self._upload_semaphore:
+                    if state['last_reported_bytes'] == 0:
+                        # Don't count time spent queued for a slot
+                        state['start_ns'] = time.monotonic_ns()
+                    # Upload with progress tracking
+                    try:
+                        return await send_media(
+                            chat_id=chat_id,
+                            progress=progress,
+                            progress_args=progress_args,
+                            **media_kwargs
+                        )
+                    except FilePartMissing as e:
+                        # Telegram lost that part; the retry sends it again
+                        self.client.forget_upload(file_path, part=e.value)
+                        raise
 
+            result = await self._retry(
+                send, "Upload", lambda text: self._post_status(state, text)
+            )
         except Exception as e:
-            logger.error(f"Upload failed: {e}")
-            return None
+            error_msg = f"❌ Upload failed: {str(e)}"
+            logger.error(error_msg)
+            if drain_task is not None:
+                drain_task.cancel()
+            if progress_message is not None:
+                await self._finish_status(progress_message, chat_id, error_msg)
+            raise
+
+        self.client.forget_upload(file_path)
+        if progress_message is not None:
+            # Upload successful; stop applying progress edits
+            drain_task.cancel()
+            await self._finish_status(
+                progress_message,
+                chat_id,
+                f"✅ Upload complete: {file_path.name}\n"
+                f"Time taken: {self.format_time((time.monotonic_ns() - state['start_ns']) / NS_PER_SECOND)}"
+            )
+        return result
+
+    async def _finish_status(self, message: Message, chat_id: Union[str, int], text: str) -> None:
+        """Put the final text on an upload's progress message.
+
+        A failed edit is only logged, so it never changes whether the
+        upload itself is reported as done or failed.
+        """
+        await self._throttle(chat_id)
+        try:
+            await message.edit_text(text)
+        except Exception as e:
+            logger.warning(f"Could not update progress message: {e}")
 
-    async def send_message(self, chat_id: Union[int, str], text: str) -> Optional[Message]:
+    async def send_message(
+        self,
+        chat_id: Union[str, int],
+        text: str
+    ) -> Optional[Message]:
         """Send a text message to a Telegram chat.
         
+        FloodWait and transient errors are retried like uploads, see _retry.
+        
         Args:
             chat_id: Telegram chat ID
             text: Message text to send
@@ -902,12 +1075,17 @@ class TelegramUploader:
         Returns:
             Optional[Message]: The sent message if successful
         """
+        async def send():
+            if not self._started:
+                await self.start()
+            await self._throttle(chat_id)
+            return await self.client.send_message(
+                chat_id=chat_id,
+                text=text
+            )
+
         try:
-            async with self.client:
-                return await self.client.send_message(
-                    chat_id=chat_id,
-                    text=text
-                )
+            return await self._retry(send, "Send message")
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
             return None
@@ -919,6 +1097,8 @@ class TelegramUploader:
         duration: int = 0,
         performer: str = "",
         title: str = "",
+        show_progress: bool = True,
+        progress_callback: Optional[Callable[[int, int], Any]] = None,
         **kwargs
     ) -> Optional[Message]:
         """Upload an audio file to Telegram with metadata.
@@ -929,348 +1109,131 @@ class TelegramUploader:
             duration: Duration in seconds
             performer: Audio performer name
             title: Audio title
+            show_progress: Post and edit a progress message in the chat
+            progress_callback: Called with (uploaded bytes, total bytes), see upload_file
             **kwargs: Additional arguments passed to send_audio
             
         Returns:
             Optional[Message]: Message object if successful
         """
         file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-            
-        file_size = file_path.stat().st_size
-        state = self._init_upload_state(file_size)
+        return await self._upload(
+            self.client.send_audio,
+            file_path,
+            chat_id,
+            audio=str(file_path),
+            file_name=file_path.name,
+            duration=duration,
+            performer=performer,
+            title=title,
+            show_progress=show_progress,
+            progress_callback=progress_callback,
+            **kwargs
+        )
 
-        try:
-            async with self.client:
-                # Send initial progress message
-                progress_message = await self.client.send_message(
-                    chat_id=chat_id,
-                    text=f"Starting upload of {file_path.name} ({self.format_size(file_size)
-        """Upload an audio file to Telegram.
+    async def upload_files(
+        self,
+        file_paths: Iterable[Union[str, Path]],
+        chat_id: Union[str, int],
+        concurrency: int = 4,
+        show_progress: bool = False,
+        **kwargs
+    ) -> List[Union[Message, None, BaseException]]:
+        """Upload several files, at most `concurrency` at a time.
+        
+        All uploads share the one started client and its session. Per-file
+        progress messages are off by default; a single summary message is
+        sent once the batch is done instead.
         
         Args:
-            file_path: Path to the audio file
+            file_paths: Paths of the files to upload
             chat_id: Telegram chat ID
-            duration: Duration in seconds
-            performer: Audio performer name
-            title: Audio title
-        
+            concurrency: Maximum number of uploads in flight; max_concurrent_uploads
+                still caps the transfers that run at once
+            show_progress: Post a progress message for every file
+            **kwargs: Additional arguments passed to upload_file
+            
         Returns:
-            Optional[Message]: Message object if successful
+            List with the sent message, or the raised exception, per file
+            in input order
         """
-        if isinstance(file_path, str):
-            file_path = Path(file_path)
-
-        if not file_path.exists():
-            logger.error(f"File not found: {file_path}")
-            return None
-
-        try:
-            async with self.client:
-                # Send initial message
-                progress_message = await self.client.send_message(
-                    chat_id=chat_id,
-                    text=f"Starting upload of {file_path.name}..."
-                )
+        if not self._started:
+            await self.start()
+        semaphore = asyncio.Semaphore(concurrency)
 
-                self.start_time = time.time()
-
-                # Upload the audio
-                result = await self.client.send_audio(
-                    chat_id=chat_id,
-                    audio=str(file_path),
-                    duration=duration,
-                    performer=performer,
-                    title=title,
-                    progress=self.progress,
-                    progress_args=(progress_message,)
+        async def upload_one(file_path):
+            async with semaphore:
+                return await self.upload_file(
+                    file_path, chat_id, show_progress=show_progress, **kwargs
                 )
 
-                return result
-
-        except Exception as e:
-            logger.error(f"Upload failed: {e}")
-            return None
+        results = await asyncio.gather(
+            *(upload_one(file_path) for file_path in file_paths),
+            return_exceptions=True
+        )
+        if not show_progress:
+            failed = sum(isinstance(result, BaseException) for result in results)
+            summary = f"✅ Uploaded {len(results) - failed}/{len(results)} files"
+            if failed:
+                summary += f" ({failed} failed)"
+            logger.info(summary)
+            await self.send_message(chat_id, summary)
+        return results
 
-    async def send_message(
+    async def upload_stream(
         self,
+        chunks: AsyncIterable[bytes],
         chat_id: Union[str, int],
-        text: str
+        file_name: str,
+        caption: Optional[str] = None
     ) -> Optional[Message]:
-        """Send a text message to a Telegram chat."""
-        try:
-            async with self.client:
-                return await self.client.send_message(
-                    chat_id=chat_id,
-                    text=text
-                )
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}")
-            return None
-
-
-                file_size = file_path.stat().st_size
-                self._upload_start_time = time.time()
-                self._progress_callback = progress_callback
-
-                # Calculate appropriate timeouts based on file size
-                timeouts = self.calculate_timeouts(file_size)
-                if 'timeouts' not in kwargs:
-                    kwargs.update(timeouts)
-
-                retry_count = 0
-                while retry_count < self.max_retries:
-                    try:
-                        # Use proper streaming upload
-                        with open(file_path, 'rb') as file:
-                            result = await self.bot.send_document(
-                                chat_id=chat_id,
-                                document=file,
-                                filename=file_path.name,
-                                caption=caption,
-                                progress_callback=self._progress,
-                                **kwargs
-                            )
-                            return True
-
-                    except RetryAfter as e:
-                        logger.warning(f"Rate limit hit, waiting {e.retry_after} seconds...")
-                        await asyncio.sleep(e.retry_after)
-                        continue
-
-                    except (NetworkError, TimedOut) as e:
-                        retry_count += 1
-                        if retry_count < self.max_retries:
-                            wait_time = min(1800, 60 * (2 ** (retry_count - 1)))
-                            logger.warning(f"Network error, retrying in {wait_time}s: {str(e)}")
-                            await asyncio.sleep(wait_time)
-                        else:
-                            logger.error("Max retries reached. Upload failed.")
-                            raise
-
-                    except Exception as e:
-                        logger.error(f"Upload failed: {str(e)}")
-                        raise
-
-                    # Update progress
-                    state.uploaded_size += len(chunk)
-                    state.current_chunk += 1
-
-
-            # Send final message with caption
-            await self.bot.send_message(
-                chat_id=chat_id,
-                text=caption if caption else f"Successfully uploaded: {file_path.name}"
-            )
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Upload failed for {file_path}: {str(e)}")
-            if state_callback:
-                state_callback("Upload failed", {'error': str(e)})
-            raise
-        finally:
-            self._current_upload = None
-            self._upload_start_time = None
-
-    async def upload_audio(
-        self,
-        file_path: Union[str, Path],
-        chat_id: Union[str, int],
-        caption: Optional[str] = None,
-        chunk_size: int = 8388608,  # 8 MB chunks - optimized for audiobook uploads
-        progress_callback: Optional[ProgressCallback] = None,
-        state_callback: Optional[StateCallback] = None
-    ) -> bool:
-        """Upload an audio file to Telegram with optimizations for audiobooks.
-
-        This method is specifically optimized for large audiobook files with
-        the following features:
-        1. 8 MB chunk size for efficient uploads
-        2. Extended timeouts (10 min base + 2 min per 20 MB)
-        3. Exponential backoff retry with resume capability
-        4. Progress tracking for large files
-
+        """Upload a document from an async byte stream of unknown length.
+        
+        Useful for piping an encoder's stdout to Telegram without a temporary
+        file. A stream can't be replayed, so only the final send is retried;
+        part upload errors are raised to the caller.
+        
         Args:
-            file_path: Path to the audio file
-            chat_id: Telegram chat/channel ID to upload to
-            caption: Optional caption for the audio file
-            chunk_size: Size of chunks for large file uploads (default: 8 MB)
-            progress_callback: Optional callback for upload progress updates
+            chunks: Async iterable yielding the file contents
+            chat_id: Telegram chat ID
+            file_name: Name shown for the document
+            caption: Optional caption for the file
             
         Returns:
-            bool: True if upload successful, False otherwise
-            
-        Raises:
-            FileNotFoundError: If the audio file does not exist
-            TelegramError: If there is an error communicating with Telegram
+            Optional[Message]: The sent message if successful
         """
-        try:
-            file_path = Path(file_path)
-            if not file_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-                
-            uploader = self.ChunkedUploader(self.bot, chunk_size)
-            state = await uploader.init_upload(file_path)
-            
-            if state_callback:
-                state_callback("Initialized upload", {
-                    "file_size": state.total_size,
-                    "num_chunks": len(state.chunk_hashes)
-                })
-
-            file_size = file_path.stat().st_size
-            timeouts = self.calculate_timeouts(file_size)
-            
-            logger.info(f"Starting upload of {file_path.name} ({file_size/1024/1024:.1f}MB)")
-            logger.info(f"Upload timeouts: Read/Write {timeouts['read_timeout']}s, Connect {timeouts['connect_timeout']}s")
-            
-            retry_count = 0
-            while retry_count < self.max_retries:
-                try:
-                    async with self.bot:
-                        # Send initial status
-                        await self.bot.send_message(
-                            chat_id=chat_id,
-                            text=f"Starting upload of {file_path.name} ({file_size/1024/1024:.1f}MB)..."
-                        )
-                        
-                        # Upload file in chunks
-                        async with aiofiles.open(file_path, 'rb') as file:
-                            while state.current_chunk < len(state.chunk_hashes):
-                                chunk = await file.read(chunk_size)
-                                if not chunk:
-                                    break
-                                    
-                                if not await uploader.verify_chunk(chunk, state.chunk_hashes[state.current_chunk]):
-                                    logger.error(f"Chunk {state.current_chunk} verification failed")
-                                    raise ValueError(f"Chunk verification failed at position {state.current_chunk}")
-                                    
-                                chunk_uploaded = await uploader.upload_chunk(
-                                    chat_id=chat_id,
-                                    chunk=chunk,
-                                    filename=file_path.name,
-                                    offset=state.current_chunk * chunk_size,
-                                    total_size=state.total_size,
-                                    timeouts=timeouts
-                                )
-                                
-                                if not chunk_uploaded:
-                                    raise NetworkError(f"Failed to upload chunk {state.current_chunk}")
-                                    
-                                state.uploaded_size += len(chunk)
-                                state.current_chunk += 1
-                                
-                                if progress_callback:
-                                    elapsed = time.time() - state.start_time
-                                    speed = state.uploaded_size / elapsed if elapsed > 0 else 0
-                                    remaining = state.total_size - state.uploaded_size
-                                    eta = remaining / speed if speed > 0 else 0
-                                    
-                                    # Calculate human readable values
-                                    speed_mb = speed / (1024 * 1024)  # Convert to MB/s
-                                    percent = (state.uploaded_size / state.total_size) * 100
-                                    
-                                    # Format progress info
-                                    progress_info = {
-                                        'bytes_uploaded': state.uploaded_size,
-                                        'total_bytes': state.total_size,
-                                        'speed_mb': speed_mb,
-                                        'eta_seconds': eta,
-                                        'percent': percent,
-                                        'current_chunk': state.current_chunk,
-                                        'total_chunks': len(state.chunk_hashes)
-                                    }
-                                    
-                                    progress_callback(state.uploaded_size, state.total_size, speed, progress_info)
-                                    
-                                if state_callback:
-                                    state_callback("Chunk uploaded", {
-                                        "chunk": state.current_chunk,
-                                        "total_chunks": len(state.chunk_hashes),
-                                        "uploaded_size": state.uploaded_size
-                                    })
-                                    
-                        # Send completion message
-                        await self.bot.send_message(
-                            chat_id=chat_id,
-                            text=caption if caption else f"Successfully uploaded {file_path.name}"
-                        )
-                        logger.info(f"Successfully uploaded {file_path.name}")
-                        return True
-                        
-                except RetryAfter as e:
-                    retry_count += 1
-                    wait_time = e.retry_after
-                    logger.warning(f"Rate limit hit. Waiting {wait_time} seconds before retry...")
-                    await asyncio.sleep(wait_time)
-                    continue
-                except (NetworkError, TimedOut) as e:
-                    retry_count += 1
-                    if retry_count < self.max_retries:
-                        # Exponential backoff starting at 1 minute
-                        wait_time = min(1800, 60 * (2 ** (retry_count - 1)))  # Max 30 minutes
-                        error_msg = f"Upload failed (attempt {retry_count}/{self.max_retries})\n"
-                        error_msg += f"Error: {str(e)}\n"
-                        error_msg += f"Retrying in {wait_time} seconds ({wait_time/60:.1f} minutes)..."
-                        
-                        logger.warning(error_msg)
-                        await self.bot.send_message(chat_id=chat_id, text=error_msg)
-                        await asyncio.sleep(wait_time)
-                    else:
-                        logger.error(f"Max retries ({self.max_retries}) reached. Upload failed.")
-                        raise
-                except Exception as e:
-                    logger.error(f"Failed to upload {file_path}: {str(e)}")
-                    raise
-                        
-        except TelegramError as e:
-            error_msg = f"Telegram error while uploading {file_path.name}: {e}"
-            logger.error(error_msg)
-            await self.bot.send_message(chat_id=chat_id, text=error_msg)
-            raise
-        except Exception as e:
-            error_msg = f"Error uploading {file_path.name}: {e}"
-            logger.error(error_msg)
-            await self.bot.send_message(chat_id=chat_id, text=error_msg)
-            raise
+        if not self._started:
+            await self.start()
+        if self._upload_semaphore is None:
+            self._upload_semaphore = asyncio.Semaphore(self.max_concurrent_uploads)
+        async with self._upload_semaphore:
+            input_file = await self.client.save_stream(chunks, file_name)
 
-    async def send_message(
-        self,
-        chat_id: Union[str, int],
-        text: str,
-        retry: bool = True
-    ) -> bool:
-        """Send a text message to a Telegram chat.
+        media = raw.types.InputMediaUploadedDocument(
+            mime_type=self.client.guess_mime_type(file_name) or "application/octet-stream",
+            file=input_file,
+            force_file=True,
+            attributes=[raw.types.DocumentAttributeFilename(file_name=file_name)]
+        )
 
-        Args:
-            chat_id: Telegram chat/channel ID
-            text: Message text to send
-            retry: Whether to retry on failure
+        async def send():
+            await self._throttle(chat_id)
+            return await self.client.invoke(
+                raw.functions.messages.SendMedia(
+                    peer=await self.client.resolve_peer(chat_id),
+                    media=media,
+                    random_id=self.client.rnd_id(),
+                    **await utils.parse_text_entities(self.client, caption or "", None, None)
+                )
+            )
 
-        Returns:
-            bool: True if message sent successfully
-        """
-        retry_count = 0
-        while retry_count < (self.max_retries if retry else 1):
-            try:
-                async with self.bot:
-                    await self.bot.send_message(
-                        chat_id=chat_id,
-                        text=text,
-                        read_timeout=30,
-                        write_timeout=30,
-                        connect_timeout=30
-                    )
-                return True
-            except TelegramError as e:
-                retry_count += 1
-                if retry and retry_count < self.max_retries:
-                    wait_time = min(60, 10 * retry_count)
-                    logger.warning(f"Message send failed (attempt {retry_count}/{self.max_retries}), retrying in {wait_time} seconds: {e}")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Error sending message: {e}")
-                    return False
+        r = await self._retry(send, "Send media")
+
+        for update in r.updates:
+            if isinstance(update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage)):
+                return await Message._parse(
+                    self.client, update.message,
+                    {user.id: user for user in r.users},
+                    {chat.id: chat for chat in r.chats}
+                )
+        return None
@@ -1,18 +1,15 @@
-import os
-from telegram import Bot
 import asyncio
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from bot_factory import get_bot, send_message
+from env import ENV
 
 async def send_test_message():
     try:
         # Initialize bot with token
-        bot = Bot(token=os.getenv('BOT_TOKEN'))
+        bot = get_bot(ENV['BOT_TOKEN'])
         
         # Send test message
-        await bot.send_message(
+        await send_message(
+            bot,
             chat_id=5423238284,  # Your verified chat ID
             text="Hello! Your bot is working correctly! 🎉\n\nThis confirms that:\n1. Bot token is valid\n2. Chat ID is correct\n3. Bot has permission to send messages"
         )
@@ -23,5 +20,10 @@ async def send_test_message():
 
 # Run the async function
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(send_test_message())
 
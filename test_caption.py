@@ -21,15 +21,14 @@ def main():
         print("\nExtracting metadata...")
         metadata = extract_metadata(file_path)
         
-        print("\nRaw Metadata:")
-        for key, value in metadata.items():
-            print(f"{key}: {value}")
-            
-        print("\nFormatted Caption:")
+        # One write per block instead of one print per line
+        sys.stdout.write("\nRaw Metadata:\n" + "".join(
+            f"{key}: {value}\n" for key, value in metadata.items()
+        ))
+
         caption = format_caption(metadata)
-        print("-" * 50)
-        print(caption)
-        print("-" * 50)
+        rule = "-" * 50
+        sys.stdout.write(f"\nFormatted Caption:\n{rule}\n{caption}\n{rule}\n")
         
     except Exception as e:
         print(f"\nError processing file: {str(e)}")
@@ -1,12 +1,11 @@
-import os
 import logging
 import sys
 import asyncio
 from datetime import datetime
-from dotenv import load_dotenv
 import psycopg2
-import telegram
 from telegram.error import TelegramError
+from bot_factory import get_bot, send_message, with_retry
+from env import ENV
 
 # Set up logging
 logging.basicConfig(
@@ -19,7 +18,7 @@ def test_database_connection():
     """Test connection to PostgreSQL database."""
     try:
         logger.info("Testing database connection...")
-        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+        conn = psycopg2.connect(ENV['DATABASE_URL'], connect_timeout=10)
         logger.info("✅ Database connection successful!")
         conn.close()
         return True
@@ -31,8 +30,8 @@ async def test_telegram_bot():
     """Test Telegram bot connection and functionality."""
     try:
         logger.info("Testing Telegram bot connection...")
-        bot = telegram.Bot(token=os.getenv('BOT_TOKEN'))
-        bot_info = await bot.get_me()
+        bot = get_bot(ENV['BOT_TOKEN'])
+        bot_info = await with_retry(bot.get_me)
         logger.info(f"✅ Successfully connected to bot: {bot_info.first_name}")
         return bot
     except TelegramError as e:
@@ -43,7 +42,7 @@ async def send_test_message(bot):
     """Send a test message to verify bot functionality."""
     try:
         logger.info("Sending test message...")
-        chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        chat_id = ENV['TELEGRAM_CHAT_ID']
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         message = (
             f"\U0001F504 System Test ({current_time})\n\n"
@@ -52,7 +51,7 @@ async def send_test_message(bot):
             "✅ Message Sending: OK\n\n"
             "Ready to process audiobook uploads! \U0001F4DA"
         )
-        await bot.send_message(chat_id=chat_id, text=message)
+        await send_message(bot, chat_id=chat_id, text=message)
         logger.info("✅ Test message sent successfully!")
         return True
     except TelegramError as e:
@@ -61,23 +60,23 @@ async def send_test_message(bot):
 
 async def async_main():
     """Async main function to run all tests."""
-    # Load environment variables
-    load_dotenv()
-    
     # Check for required environment variables
     required_vars = ['DATABASE_URL', 'BOT_TOKEN', 'TELEGRAM_CHAT_ID']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = [var for var in required_vars if not ENV[var]]
     
     if missing_vars:
         logger.error(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
         sys.exit(1)
 
-    # Run tests
-    if not test_database_connection():
+    # Run tests; the database and bot checks don't depend on each other
+    db_ok, bot = await asyncio.gather(
+        asyncio.get_running_loop().run_in_executor(None, test_database_connection),
+        test_telegram_bot()
+    )
+    if not db_ok:
         logger.error("❌ Database connection test failed!")
         sys.exit(1)
 
-    bot = await test_telegram_bot()
     if not bot:
         logger.error("❌ Telegram bot connection test failed!")
         sys.exit(1)
@@ -90,6 +89,11 @@ async def async_main():
 
 def main():
     """Main function to run all tests."""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(async_main())
 
 if __name__ == "__main__":
@@ -2,12 +2,13 @@
 
 import os
 import sys
+import time
 import asyncio
 import logging
 from pathlib import Path
-from dotenv import load_dotenv
-from humanize import naturalsize
-from telegram_uploader import TelegramUploader
+from typing import Tuple
+from telegram_uploader import TelegramUploader, install_uvloop
+from env import ENV
 
 # Set up logging
 logging.basicConfig(
@@ -16,29 +17,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def validate_file(file_path: str) -> Path:
-    """Validate that the file exists."""
-    path = Path(file_path)
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-    return path
+# Same binary-unit formatter the uploader uses for its progress messages
+format_size = TelegramUploader.format_size
 
-def load_environment():
+def validate_file(file_path: str) -> Tuple[Path, os.stat_result]:
+    """Validate that the file exists, returning its path and stat result."""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+    return Path(file_path), st
+
+async def prompt(text: str) -> str:
+    """Read a line from the user without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, input, text)
+
+async def load_environment():
     """Load and validate environment variables."""
-    load_dotenv()
     required_vars = ['TELEGRAM_API_ID', 'TELEGRAM_API_HASH']
-    missing = [var for var in required_vars if not os.getenv(var)]
+    missing = [var for var in required_vars if not ENV[var]]
     if missing:
         raise EnvironmentError(f"Missing required environment variables: {', '.join(missing)}")
     
     env = {
-        'api_id': os.getenv('TELEGRAM_API_ID'),
-        'api_hash': os.getenv('TELEGRAM_API_HASH')
+        'api_id': ENV['TELEGRAM_API_ID'],
+        'api_hash': ENV['TELEGRAM_API_HASH']
     }
-    chat_id = os.getenv('TELEGRAM_CHAT_ID')
+    chat_id = ENV['TELEGRAM_CHAT_ID']
     
     if not chat_id:
-        chat_id = input("Please enter Telegram chat ID: ").strip()
+        chat_id = (await prompt("Please enter Telegram chat ID: ")).strip()
         if not chat_id:
             raise ValueError("Chat ID is required")
             
@@ -53,19 +61,18 @@ async def main():
             sys.exit(1)
 
         # Validate input file
-        file_path = validate_file(sys.argv[1])
+        file_path, st = validate_file(sys.argv[1])
         logger.info(f"Processing file: {file_path}")
 
         # Load environment variables
-        env = load_environment()
+        env = await load_environment()
         logger.info("Environment variables loaded successfully")
 
         # Generate caption
-        # Generate caption
-        file_size = file_path.stat().st_size
-        caption = f"Audiobook: {file_path.stem}\nSize: {naturalsize(file_size)}"
+        file_size = st.st_size
+        caption = f"Audiobook: {file_path.stem}\nSize: {format_size(file_size)}"
         
-        # Initialize uploader with progress callback
+        # Initialize uploader
         uploader = TelegramUploader(
             api_id=env['api_id'],
             api_hash=env['api_hash']
@@ -75,30 +82,39 @@ async def main():
         # Check file size
         max_size = 2000 * 1024 * 1024  # 2GB limit for Telegram
         if file_size > max_size:
-            raise ValueError(f"File too large: {naturalsize(file_size)} exceeds {naturalsize(max_size)}")
-        def progress_callback(current, total, speed=None, eta=None):
+            raise ValueError(f"File too large: {format_size(file_size)} exceeds {format_size(max_size)}")
+        total_size = format_size(file_size)
+        started = last_log_ts = None
+
+        def progress_callback(current, total):
+            nonlocal started, last_log_ts
+            # Log at most every 250 ms; formatting every part is wasted work
+            now = time.monotonic()
+            if started is None:
+                started = now
+            elif now - last_log_ts < 0.25 and current < total:
+                return
+            last_log_ts = now
             percentage = (current / total) * 100
-            current_size = naturalsize(current)
-            total_size = naturalsize(total)
-            speed_str = f"Speed: {naturalsize(speed)}/s" if speed else ""
-            eta_str = f"ETA: {eta}" if eta else ""
-            logger.info(f"Progress: {percentage:.1f}% | {current_size}/{total_size} | {speed_str} | {eta_str}")
+            elapsed = now - started
+            speed = current / elapsed if elapsed else 0
+            speed_str = f"Speed: {format_size(speed)}/s" if speed else ""
+            eta_str = f"ETA: {TelegramUploader.format_time((total - current) / speed)}" if speed else ""
+            logger.info(f"Progress: {percentage:.1f}% | {format_size(current)}/{total_size} | {speed_str} | {eta_str}")
 
-        uploader.progress_callback = progress_callback
         # Confirm upload
-        confirmation = input("Proceed with upload? (y/n): ")
+        confirmation = await prompt("Proceed with upload? (y/n): ")
         if confirmation.lower() != 'y':
             logger.info("Upload cancelled by user")
             return
 
         # Upload file
-        # Start upload
         logger.info("Starting upload...")
         result = await uploader.upload_file(
             file_path=str(file_path),
             chat_id=env['chat_id'],
             caption=caption,
-            chunk_size=2097152  # 2MB chunks
+            progress_callback=progress_callback
         )
         if result:
             logger.info("Upload completed successfully!")
@@ -116,5 +132,6 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
 
@@ -4,7 +4,8 @@ import os
 import sys
 import asyncio
 from pathlib import Path
-from telegram_uploader import TelegramUploader
+from telegram_uploader import TelegramUploader, install_uvloop
+from env import ENV
 
 # Example usage:
 # python test_uploader.py api_id api_hash chat_id file_path
@@ -23,8 +24,8 @@ async def test_upload(api_id: str, api_hash: str, chat_id: str, file_path: str):
 
     print(f"Starting upload of {file_path} to chat {chat_id}")
     try:
-        # Start the client
-        async with uploader.client:
+        # Connect once; every upload below reuses the session
+        async with uploader:
             # Determine file type and use appropriate upload method
             path = Path(file_path)
             if path.suffix.lower() in ['.mp3', '.m4a', '.m4b', '.ogg', '.wav']:
@@ -54,9 +55,9 @@ async def test_upload(api_id: str, api_hash: str, chat_id: str, file_path: str):
 
 def main():
     # Get credentials from command line or environment
-    api_id = sys.argv[1] if len(sys.argv) > 1 else os.getenv('TELEGRAM_API_ID')
-    api_hash = sys.argv[2] if len(sys.argv) > 2 else os.getenv('TELEGRAM_API_HASH')
-    chat_id = sys.argv[3] if len(sys.argv) > 3 else os.getenv('TELEGRAM_CHAT_ID')
+    api_id = sys.argv[1] if len(sys.argv) > 1 else ENV['TELEGRAM_API_ID']
+    api_hash = sys.argv[2] if len(sys.argv) > 2 else ENV['TELEGRAM_API_HASH']
+    chat_id = sys.argv[3] if len(sys.argv) > 3 else ENV['TELEGRAM_CHAT_ID']
     file_path = sys.argv[4] if len(sys.argv) > 4 else None
 
     if not all([api_id, api_hash, chat_id, file_path]):
@@ -70,6 +71,7 @@ def main():
         sys.exit(1)
 
     # Run the upload test
+    install_uvloop()
     asyncio.run(test_upload(api_id, api_hash, chat_id, file_path))
 
 if __name__ == "__main__":
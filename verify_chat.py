@@ -1,7 +1,6 @@
-import os
-from telegram import Bot
 import asyncio
-from dotenv import load_dotenv
+from bot_factory import get_bot, send_message
+from env import ENV
 import logging
 
 # Set up logging
@@ -13,23 +12,22 @@ logger = logging.getLogger(__name__)
 
 async def verify_chat():
     try:
-        # Load environment variables
-        load_dotenv()
-        bot_token = os.getenv('BOT_TOKEN')
-        chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        bot_token = ENV['BOT_TOKEN']
+        chat_id = ENV['TELEGRAM_CHAT_ID']
         
         if not bot_token or not chat_id:
             logger.error("Missing required environment variables (BOT_TOKEN or TELEGRAM_CHAT_ID)")
             return
         
         # Create bot instance
-        bot = Bot(token=bot_token)
+        bot = get_bot(bot_token)
         
         # Send test message
         logger.info(f"Attempting to send message to chat ID: {chat_id}")
         message = "🎯 Test message from your audiobook bot!\n\nIf you can see this message, the bot is working correctly."
         
-        await bot.send_message(
+        await send_message(
+            bot,
             chat_id=int(chat_id),
             text=message
         )
@@ -40,5 +38,10 @@ async def verify_chat():
         logger.error("Error details:", exc_info=True)
         
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(verify_chat())
 